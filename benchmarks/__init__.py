@@ -0,0 +1,6 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+# Headless benchmarks, which don't need pygame or a display.
+# Run from the repository root with: python -m benchmarks --help
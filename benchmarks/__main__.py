@@ -0,0 +1,136 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+# Runs the headless benchmark scenarios, and optionally saves the results as JSON
+# and compares them against the results of an earlier run.
+# Run from the repository root with: python -m benchmarks [--quick] [--output FILE] [--compare FILE]
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+
+import specs
+from . import scenarios
+
+def timeScenario(function, params, repeats):
+
+    '''
+    Sets up a scenario, and times it a number of times.
+    :param function function: The scenario function.
+    :param dict params: The keyword arguments for the scenario.
+    :param int repeats: The number of times to time the scenario.
+    :return list(float): Returns the time taken by each repeat, in seconds.
+    '''
+
+    run = function(**params)
+
+    # run once to warm up, then time with the garbage collector disabled
+    run()
+    times = []
+    gc.collect()
+    gcEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            startTime = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - startTime)
+    finally:
+        if gcEnabled:
+            gc.enable()
+
+    return times
+
+def runScenarios(quick = False, repeats = 5, names = None):
+
+    '''
+    Runs all (or the named) scenarios.
+    :param bool quick: Uses the smaller quick sizes, if True (default = False).
+    :param int repeats: The number of times to time each scenario (default = 5).
+    :param list(str) names: The names of the scenarios to run (default = None, for all scenarios).
+    :return dict: Returns the results, along with details of the environment.
+    '''
+
+    results = []
+    for name, function, params, quickParams in scenarios.scenarios:
+        if names is not None and name not in names:
+            continue
+        for p in (quickParams if quick is True else params):
+            times = timeScenario(function, p, repeats)
+            result = {
+                'name': name,
+                'key': name + '(' + ', '.join(k + '=' + str(v) for k, v in sorted(p.items())) + ')',
+                'params': p,
+                'repeats': repeats,
+                'min': min(times),
+                'median': statistics.median(times),
+                'max': max(times)
+            }
+            results.append(result)
+            print('{:<60} {:>10.3f} ms'.format(result['key'], result['min'] * 1000), file = sys.stderr)
+
+    return {
+        'specsVersion': specs.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'quick': quick,
+        'results': results
+    }
+
+def compareResults(results, baseline, threshold):
+
+    '''
+    Compares the fastest time of each scenario against an earlier run.
+    :param dict results: The results of this run.
+    :param dict baseline: The results of an earlier run.
+    :param float threshold: The ratio of new to old time above which a scenario has regressed.
+    :return list(str): Returns the keys of the scenarios that have regressed.
+    '''
+
+    baselineTimes = {r['key']: r['min'] for r in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        oldTime = baselineTimes.get(result['key'])
+        if oldTime is None:
+            continue
+        ratio = result['min'] / oldTime
+        regressed = ratio > threshold
+        if regressed:
+            regressions.append(result['key'])
+        print('{:<60} {:>6.2f}x{}'.format(result['key'], ratio, '  REGRESSION' if regressed else ''), file = sys.stderr)
+    return regressions
+
+def main():
+
+    parser = argparse.ArgumentParser(prog = 'python -m benchmarks', description = 'Runs the headless ECS benchmarks.')
+    parser.add_argument('--quick', action = 'store_true', help = 'use smaller sizes')
+    parser.add_argument('--repeats', type = int, default = 5, help = 'the number of times to time each scenario')
+    parser.add_argument('--scenario', action = 'append', dest = 'names', help = 'a scenario to run (can be repeated)')
+    parser.add_argument('--output', help = 'a file to save the results to, as JSON (use - for stdout)')
+    parser.add_argument('--compare', help = 'a JSON results file to compare against')
+    parser.add_argument('--threshold', type = float, default = 1.2, help = 'the slowdown ratio treated as a regression')
+    args = parser.parse_args()
+
+    results = runScenarios(quick = args.quick, repeats = args.repeats, names = args.names)
+
+    if args.output == '-':
+        print(json.dumps(results, indent = 2))
+    elif args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent = 2)
+
+    # exit with an error if any scenario has regressed
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if len(compareResults(results, baseline, args.threshold)) > 0:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+# Measures the per-call cost of component type lookups as the number of
+# registered component types grows. The cost should stay flat.
+# Run from the repository root with: python benchmarks/componentTypeLookup.py
+
+import timeit
+import specs
+
+# the number of calls timed for each measurement
+calls = 200000
+
+for typeCount in [5, 50, 500]:
+
+    # create and register the component types,
+    # using a new component manager for each run
+    componentManager = specs.ComponentManager()
+    componentTypes = [type('Component' + str(i), (specs.Component,), {}) for i in range(typeCount)]
+    for componentType in componentTypes:
+        componentManager.registerComponentType(componentType)
+
+    # add a component of the most recently registered type to an entity,
+    # which was the worst case for a linear lookup
+    lastType = componentTypes[-1]
+    entity = specs.Entity()
+    componentManager.addComponentToEntity(entity, lastType())
+
+    # time each of the lookup methods
+    results = {
+        'getComponentTypeID': timeit.timeit(lambda: componentManager.getComponentTypeID(lastType), number=calls),
+        'isComponentTypeRegistered': timeit.timeit(lambda: componentManager.isComponentTypeRegistered(lastType), number=calls),
+        'getComponentForEntity': timeit.timeit(lambda: componentManager.getComponentForEntity(entity, lastType), number=calls),
+    }
+
+    # report the cost of a single call in nanoseconds
+    for name, seconds in results.items():
+        print('{:>4} types  {:<26} {:>7.1f} ns/call'.format(typeCount, name, seconds / calls * 1e9))
+
+    # return the entity ID to the pool
+    specs.Globals._entityManager.checkinID(entity.ID)
@@ -0,0 +1,209 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+# Headless benchmark scenarios for the hot paths of the ECS.
+# Each scenario is a function that sets up its entities and systems in a new world
+# (so that scenarios don't affect each other), and returns a function to time.
+# Scenarios are registered with the sizes they are run at, with smaller sizes used for quick runs.
+
+import os
+import random
+import subprocess
+import sys
+
+import specs
+
+# the examples don't need pygame to be imported, only to be run
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples'))
+from TransformComponent import TransformComponent
+from PhysicsSystem import PhysicsSystem
+
+# a list of (name, function, list of parameter dictionaries, list of quick parameter dictionaries)
+scenarios = []
+
+def scenario(params, quickParams = None):
+
+    '''
+    Registers a scenario function, with the parameters to run it with.
+    :param list(dict) params: The keyword arguments for each run of the scenario.
+    :param list(dict) quickParams: The keyword arguments for quick runs (default = None, for the same as params).
+    '''
+
+    def register(function):
+        scenarios.append((function.__name__, function, params, quickParams if quickParams is not None else params))
+        return function
+    return register
+
+def _createWorld(count):
+
+    '''
+    Creates a world for a scenario, with room for the scenario's entities.
+    :param int count: The number of entities the scenario needs.
+    :return specs.World: Returns the world.
+    '''
+
+    return specs.World(capacity = count)
+
+class _BenchmarkComponent(specs.Component):
+
+    def __init__(self, value = 0):
+        self.value = value
+
+#
+# entity spawn and destroy churn
+#
+
+@scenario(
+    params = [{'entities': 1000, 'bulk': False}, {'entities': 10000, 'bulk': False}, {'entities': 10000, 'bulk': True}],
+    quickParams = [{'entities': 1000, 'bulk': False}, {'entities': 1000, 'bulk': True}]
+)
+def entityChurn(entities, bulk):
+
+    '''
+    Creates entities (one at a time, or using Entity.createMany()) with a component each, then destroys them all.
+    '''
+
+    world = _createWorld(entities)
+
+    def run():
+        if bulk is True:
+            created = specs.Entity.createMany(entities, lambda i: _BenchmarkComponent(i), world = world)
+        else:
+            created = [specs.Entity(_BenchmarkComponent(i), world = world) for i in range(entities)]
+        world.entityManager.destroyEntities(created)
+
+    return run
+
+#
+# component add and remove churn
+#
+
+@scenario(
+    params = [{'entities': 1000}, {'entities': 10000}],
+    quickParams = [{'entities': 1000}]
+)
+def componentChurn(entities):
+
+    '''
+    Adds a component to each of many existing entities using the ComponentManager, then removes them all.
+    '''
+
+    world = _createWorld(entities)
+    componentManager = world.componentManager
+    created = specs.Entity.createMany(entities, world = world)
+    componentManager.registerComponentType(_BenchmarkComponent)
+
+    def run():
+        for entity in created:
+            componentManager.addComponentToEntity(entity, _BenchmarkComponent())
+        for entity in created:
+            componentManager.removeComponentTypeFromEntity(entity, _BenchmarkComponent)
+
+    return run
+
+#
+# Scene.update() with many systems
+#
+
+@scenario(
+    params = [{'systems': s, 'entities': 10000, 'matchRatio': r} for s in (1, 10) for r in (0.1, 0.5, 1.0)],
+    quickParams = [{'systems': s, 'entities': 1000, 'matchRatio': r} for s in (1, 10) for r in (0.1, 1.0)]
+)
+def sceneUpdate(systems, entities, matchRatio):
+
+    '''
+    Updates a scene with a number of systems, each requiring a different component type.
+    Each entity has each system's component type with a probability of matchRatio.
+    '''
+
+    world = _createWorld(entities)
+
+    # a component type and a system processing it, for each system
+    componentTypes = []
+    scene = specs.Scene(world = world)
+    for i in range(systems):
+        componentType = type('BenchmarkComponent' + str(i), (_BenchmarkComponent,), {})
+        componentTypes.append(componentType)
+        scene.addSystem(type('BenchmarkSystem' + str(i), (_CountingSystem,), {'componentType': componentType})())
+
+    # add the required components to the chosen proportion of entities
+    rng = random.Random(0)
+    created = specs.Entity.createMany(entities, world = world)
+    for componentType in componentTypes:
+        matched = [entity for entity in created if rng.random() < matchRatio]
+        world.componentManager.addComponentsToEntities(matched, [componentType() for _ in matched])
+    scene.addEntities(created)
+
+    return scene.update
+
+class _CountingSystem(specs.System):
+
+    '''
+    A system that does a small amount of work for each entity it processes.
+    '''
+
+    componentType = _BenchmarkComponent
+
+    def init(self):
+        self.addRequiredComponentType(self.componentType)
+        self.passComponents = True
+
+    def updateEntity(self, scene, entity, component, deltaTime = 1):
+        component.value += 1
+
+#
+# importing the package
+#
+
+@scenario(params = [{'module': 'specs'}, {'module': None}])
+def importTime(module):
+
+    '''
+    Starts a new Python process that imports a module (or just starts, if module is None,
+    which gives the startup time to subtract). Importing the package should not import
+    optional dependencies (such as NumPy) or create the default world.
+    '''
+
+    # the new process imports the package being benchmarked
+    env = dict(os.environ)
+    packagePath = os.path.dirname(os.path.dirname(os.path.abspath(specs.__file__)))
+    env['PYTHONPATH'] = packagePath + os.pathsep + env.get('PYTHONPATH', '')
+    command = [sys.executable, '-c', 'import ' + module if module is not None else 'pass']
+
+    def run():
+        subprocess.run(command, env = env, check = True)
+
+    return run
+
+#
+# the example physics system
+#
+
+@scenario(
+    params = [{'entities': 1000}, {'entities': 10000}, {'entities': 100000}],
+    quickParams = [{'entities': 1000}]
+)
+def physics(entities):
+
+    '''
+    Updates a scene containing the example PhysicsSystem, without drawing.
+    '''
+
+    world = _createWorld(entities)
+
+    scene = specs.Scene(world = world)
+    scene.size = (680, 460)
+    scene.addSystem(PhysicsSystem())
+
+    rng = random.Random(0)
+    scene.spawn(entities,
+        lambda i: TransformComponent(
+            position = (rng.randint(10, 670), rng.randint(10, 450)),
+            direction = (rng.random() * 2 - 1, rng.random() * 2 - 1),
+            size = rng.randint(10, 30),
+            speed = rng.randint(2, 4)
+        )
+    )
+
+    return scene.update
@@ -0,0 +1,163 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+# Checks that running systems concurrently with an ecs.Scheduler gives the same results every time,
+# whichever thread runs first. Two systems that don't conflict run in the same stage, and each
+# spawns many entities using the scene's command buffer. The spawned entities should be given the same IDs,
+# and be added to the scene in the same order, on every run. Two systems that mark components as changed
+# are also run in the same stage, and should share the same change tick, so that a later system
+# finds the same changed entities as when the systems are run one at a time. An error is raised if a check fails.
+# Run from the repository root with: python benchmarks/schedulerDeterminism.py
+
+import specs
+
+# the number of runs compared, the frames in each run, and the entities each system spawns per frame
+runs = 5
+frames = 3
+spawnsPerFrame = 2000
+
+class _SpawnedComponent(specs.Component):
+
+    def __init__(self, value = 0):
+        self.value = value
+
+class _OtherComponent(specs.Component):
+    pass
+
+class _SpawningSystem(specs.System):
+
+    '''
+    A system that spawns entities (destroying some of them) using the scene's command buffer.
+    Subclasses set the component type they write, so that the systems don't conflict.
+    '''
+
+    writeType = _SpawnedComponent
+    systemNumber = 0
+
+    def init(self):
+        self.addWriteComponentType(self.writeType)
+
+    def update(self, scene, deltaTime = 1):
+        for i in range(spawnsPerFrame):
+            entity = scene.commands.spawn(_SpawnedComponent(self.systemNumber * spawnsPerFrame + i))
+            if i % 7 == 0:
+                scene.commands.destroy(entity)
+
+class _FirstSpawningSystem(_SpawningSystem):
+    writeType = _SpawnedComponent
+    systemNumber = 1
+
+class _SecondSpawningSystem(_SpawningSystem):
+    writeType = _OtherComponent
+    systemNumber = 2
+
+class _ChangingSystem(specs.System):
+
+    '''
+    A system that marks a component of every entity as changed, and records the change tick it ran at each frame.
+    Subclasses set the component type they change, so that the systems don't conflict.
+    '''
+
+    changeType = _SpawnedComponent
+
+    def init(self):
+        self.addRequiredComponentType(self.changeType)
+        self.addWriteComponentType(self.changeType)
+        self.ticks = []
+
+    def update(self, scene, deltaTime = 1):
+        for entity in scene.getEntitiesForSystem(self):
+            entity.markChanged(self.changeType)
+
+    def updateEntities(self, scene, entities, deltaTime = 1):
+        self.ticks.append(scene.world.componentManager._changeTick)
+
+class _FirstChangingSystem(_ChangingSystem):
+    changeType = _SpawnedComponent
+
+class _SecondChangingSystem(_ChangingSystem):
+    changeType = _OtherComponent
+
+class _ChangeReadingSystem(specs.System):
+
+    '''
+    A system that counts the entities whose components have changed since it last updated.
+    '''
+
+    def init(self):
+        self.addRequiredComponentType(_SpawnedComponent)
+        self.addReadComponentType(_SpawnedComponent, _OtherComponent)
+        self.addChangedComponentType(_SpawnedComponent, _OtherComponent)
+        self.counts = []
+
+    def updateEntities(self, scene, entities, deltaTime = 1):
+        self.counts.append(len(entities))
+
+def runScene(systemTypes, scheduled = True, entityCount = 0):
+
+    '''
+    Updates a new scene containing the systems.
+    :param list(type(ecs.System)) systemTypes: The types of the systems to add.
+    :param bool scheduled: Runs the systems using a scheduler, if True (default = True).
+    :param int entityCount: The number of entities (with both component types) to add first (default = 0).
+    :return ecs.Scene: Returns the updated scene.
+    '''
+
+    scene = specs.Scene(world = specs.World())
+    if scheduled is True:
+        scene.scheduler = specs.Scheduler(4)
+    scene.world.componentManager.trackChanges(_SpawnedComponent, _OtherComponent)
+    scene.spawn(entityCount, lambda i: _SpawnedComponent(i), lambda i: _OtherComponent())
+    for systemType in systemTypes:
+        scene.addSystem(systemType())
+    try:
+        for _ in range(frames):
+            scene.update()
+    finally:
+        if scheduled is True:
+            scene.scheduler.shutdown()
+    return scene
+
+def checkSpawnedIDs():
+
+    '''
+    Checks that entities spawned by concurrent systems are given the same IDs, in the same order, on every run.
+    '''
+
+    results = []
+    for _ in range(runs):
+        scene = runScene([_FirstSpawningSystem, _SecondSpawningSystem])
+        assert len(scene.scheduler.getStages(scene.systems)) == 1, 'The spawning systems should run concurrently.'
+        results.append([(entity.ID, entity.getComponent(_SpawnedComponent).value) for entity in scene.entities])
+
+    expectedCount = frames * 2 * (spawnsPerFrame - len(range(0, spawnsPerFrame, 7)))
+    assert len(results[0]) == expectedCount, 'Expected ' + str(expectedCount) + ' entities, got ' + str(len(results[0])) + '.'
+    assert all(result == results[0] for result in results), 'Spawned entities were given different IDs or order.'
+    print('spawned IDs: {} entities, identical across {} runs'.format(len(results[0]), runs))
+
+def checkChangeTicks():
+
+    '''
+    Checks that systems running concurrently share a change tick, and that a later system
+    finds the same changed entities as when the systems are run one at a time.
+    '''
+
+    systemTypes = [_FirstChangingSystem, _SecondChangingSystem, _ChangeReadingSystem]
+    serialCounts = runScene(systemTypes, scheduled = False, entityCount = spawnsPerFrame).systems[2].counts
+
+    results = []
+    for _ in range(runs):
+        scene = runScene(systemTypes, entityCount = spawnsPerFrame)
+        assert [len(stage) for stage in scene.scheduler.getStages(scene.systems)] == [2, 1], 'The changing systems should run concurrently.'
+        first, second, reader = scene.systems
+        assert first.ticks == second.ticks, 'Systems in the same stage ran at different change ticks.'
+        assert reader.counts == serialCounts, 'Changed entities differ from running the systems one at a time.'
+        results.append((first.ticks, reader.counts, scene.world.componentManager._changeTick))
+
+    assert all(result == results[0] for result in results), 'Change ticks differ between runs.'
+    print('change ticks: {} per run, identical across {} runs'.format(results[0][0], runs))
+
+if __name__ == '__main__':
+    checkSpawnedIDs()
+    checkChangeTicks()
@@ -0,0 +1,43 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+import numpy
+import specs
+from ArrayTransformComponent import ArrayTransformComponent
+
+class ArrayPhysicsSystem(specs.ArraySystem):
+
+    '''
+    The array physics system updates the position of all entities
+    with an array transform component, using NumPy to process
+    all entities at once.
+    '''
+
+    # the physics system only processes entities with array transform components
+    def init(self):
+        self.addRequiredComponentType(ArrayTransformComponent)
+
+    # update the position of all entities, and do some very basic collision detection
+    def updateBatch(self, scene, views, deltaTime=1):
+
+        # get the transform data for all entities
+        transform = views[ArrayTransformComponent]
+
+        # move all entities
+        transform.position += transform.direction * (transform.speed * deltaTime)[:, None]
+
+        # calculate the radius of all entities
+        radius = (transform.size / 2)[:, None]
+
+        #
+        # screen collision detection
+        #
+
+        # entities past the left/top or right/bottom edges
+        # are moved back and change direction
+        maxPosition = numpy.array(scene.size) - radius
+        lower = transform.position <= radius
+        upper = transform.position >= maxPosition
+        transform.position[:] = numpy.clip(transform.position, radius, maxPosition)
+        transform.direction[lower | upper] *= -1
@@ -0,0 +1,18 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+import specs
+
+class ArrayTransformComponent(specs.ArrayComponent):
+
+    # the transform data is stored in NumPy arrays
+    fields = {
+        'position': ('f8', 2),
+        'direction': ('f8', 2),
+        'size': 'f8',
+        'speed': 'f8'
+    }
+
+    def __init__(self, position, direction, size, speed):
+        super().__init__(position = position, direction = direction, size = size, speed = speed)
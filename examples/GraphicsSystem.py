@@ -16,9 +16,11 @@ class GraphicsSystem(specs.System):
 
     def init(self):
 
-        # the transform and sprite components are required
+        # the transform and sprite components are required,
+        # and are passed to drawEntity()
         self.addRequiredComponentType(TransformComponent)
         self.addRequiredComponentType(SpriteComponent)
+        self.passComponents = True
         
         # create a font and text surface to display
         self.font = pygame.font.SysFont('arial', 18)
@@ -29,11 +31,7 @@ class GraphicsSystem(specs.System):
         # draw the text surface to the screen once per frame
         surface.blit(self.textSurface, (0, 0))
         
-    def drawEntity(self, scene, entity, surface = None):
+    def drawEntity(self, scene, entity, transformComponent, spriteComponent, surface = None):
         
-        # get the entity's required components
-        transformComponent = entity.getComponent(TransformComponent)
-        spriteComponent = entity.getComponent(SpriteComponent)
-
         # draw the entity as a circle, using the position, size and color data
         pygame.draw.circle(surface, spriteComponent.color, transformComponent.position, transformComponent.size // 2)
\ No newline at end of file
@@ -12,15 +12,14 @@ class PhysicsSystem(specs.System):
     with a transform component.
     '''
     
-    # the physics system only processes entities with transform components
+    # the physics system only processes entities with transform components,
+    # which are passed to updateEntity()
     def init(self):
         self.addRequiredComponentType(TransformComponent)
+        self.passComponents = True
 
     # update the position of the entity, and do some very basic collision detection
-    def updateEntity(self, scene, entity, deltaTime=1):
-
-        # get the entity transform component
-        transformComponent = entity.getComponent(TransformComponent)
+    def updateEntity(self, scene, entity, transformComponent, deltaTime=1):
 
         # create new temporary position variables
         newPosX = transformComponent.position[0] + (transformComponent.direction[0] * transformComponent.speed * deltaTime)
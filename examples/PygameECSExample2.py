@@ -25,24 +25,21 @@ scene.size = (680, 460)
 
 # create 500 entities with position and sprite components
 # containing random values, and add to the scene
-for _ in range(500):
-    scene.addEntity(
-        specs.Entity(
-            TransformComponent(
-                position = (random.randint(10, 670), random.randint(10, 450)),
-                direction = (random.random() * 2 - 1, random.random() * 2 - 1),
-                size = random.randint(10, 30),
-                speed = random.randint(2,4)
-            ),
-            SpriteComponent(random.choice([
-                    (224, 187, 228),
-                    (149, 125, 173),
-                    (210, 145, 188),
-                    (254, 200, 216),
-                    (255, 223, 211)
-            ]))
-        )
-    )
+scene.spawn(500,
+    lambda i: TransformComponent(
+        position = (random.randint(10, 670), random.randint(10, 450)),
+        direction = (random.random() * 2 - 1, random.random() * 2 - 1),
+        size = random.randint(10, 30),
+        speed = random.randint(2,4)
+    ),
+    lambda i: SpriteComponent(random.choice([
+            (224, 187, 228),
+            (149, 125, 173),
+            (210, 145, 188),
+            (254, 200, 216),
+            (255, 223, 211)
+    ]))
+)
 
 # create a physics system instance and add to the scene
 scene.addSystem(PhysicsSystem())
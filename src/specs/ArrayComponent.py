@@ -0,0 +1,86 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+from .Component import Component
+
+class ArrayComponent(Component):
+
+    '''
+    Base class for components whose data is stored in NumPy arrays.
+    Derived classes declare a schema in the 'fields' class attribute, mapping
+    field names to a NumPy dtype, or a (dtype, shape) tuple for vector fields.
+    For example: fields = {'position': ('f8', 2), 'speed': 'f8'}
+    Once added to an entity, reading and writing fields accesses the arrays directly.
+    Requires NumPy.
+    :param any values: Initial values for the component's fields (unspecified fields are 0).
+    '''
+
+    # the component's field names and types
+    fields = {}
+
+    def __init__(self, **values):
+
+        # only declared fields can be given values
+        for name in values:
+            if name not in self.fields:
+                raise TypeError(type(self).__name__ + ' has no field \'' + name + '\'.')
+
+        # field values are stored here until the component is added to an entity,
+        # after which they are stored in the component type's ArrayStorage
+        object.__setattr__(self, '_values', dict(values))
+        object.__setattr__(self, '_storage', None)
+        object.__setattr__(self, '_entityID', None)
+
+    def __getattr__(self, name):
+
+        # only called for field names, as other attributes are found normally
+        if name in type(self).fields:
+
+            # read from the values stored in the component
+            storage = self._storage
+            if storage is None:
+                return self._values.get(name)
+
+            # or from the arrays, at the entity's slot
+            return storage.arrays[name][storage._sparse[self._entityID]]
+
+        raise AttributeError(type(self).__name__ + ' has no attribute \'' + name + '\'.')
+
+    def __setattr__(self, name, value):
+
+        # non-field attributes are set normally
+        if name not in type(self).fields:
+            object.__setattr__(self, name, value)
+
+        # write to the values stored in the component
+        elif self._storage is None:
+            self._values[name] = value
+
+        # or to the arrays, at the entity's slot
+        else:
+            self._storage.arrays[name][self._storage._sparse[self._entityID]] = value
+
+    def _bind(self, storage, entityID):
+
+        '''
+        Links the component to a slot in an ArrayStorage.
+        :param ecs.ArrayStorage storage: The storage holding the component's data.
+        :param int entityID: The ID of the entity the component belongs to.
+        '''
+
+        object.__setattr__(self, '_storage', storage)
+        object.__setattr__(self, '_entityID', entityID)
+        object.__setattr__(self, '_values', {})
+
+    def _unbind(self, values):
+
+        '''
+        Unlinks the component from its ArrayStorage,
+        keeping a copy of its field values.
+        :param dict values: The field values to keep.
+        '''
+
+        object.__setattr__(self, '_storage', None)
+        object.__setattr__(self, '_entityID', None)
+        object.__setattr__(self, '_values', values)
@@ -0,0 +1,306 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+import weakref
+
+# NumPy is only required if array components are used, so it
+# isn't imported until the first ArrayStorage is created
+numpy = None
+
+from .ComponentStorage import ComponentStorage
+
+class ArrayStorage(ComponentStorage):
+
+    '''
+    Stores all components of a single ArrayComponent type as a sparse set,
+    with the data for each field in a contiguous NumPy array (struct-of-arrays).
+    Row i of each array holds the data for the component at packed position i.
+    The arrays double in size when full, and can be shrunk using compact(). Calling share() moves the arrays
+    into shared memory, so that they can be processed by other processes (see ecs.ShardPool).
+    :param dict fields: The component type's fields, mapping names to a dtype or (dtype, shape) tuple.
+    :param int capacity: The initial number of rows in each array (default = 16).
+    '''
+
+    def __init__(self, fields, capacity = 16):
+
+        global numpy
+        if numpy is None:
+            try:
+                import numpy
+            except ImportError:
+                raise ImportError('NumPy is required to store array components.')
+
+        super().__init__()
+
+        # the dtype and per-component shape of each field
+        self.fields = {}
+        for name, spec in fields.items():
+            if isinstance(spec, tuple):
+                dtype, shape = spec
+                shape = shape if isinstance(shape, tuple) else (shape,)
+            else:
+                dtype, shape = spec, ()
+            self.fields[name] = (numpy.dtype(dtype), shape)
+
+        # the shared memory blocks holding the arrays, keyed by field name
+        # (and 'entityIDArray'), or None if the arrays are not shared
+        self._sharedMemory = None
+
+        # a contiguous array for each field
+        self._capacity = capacity
+        self.arrays = {name: numpy.zeros((capacity,) + shape, dtype) for name, (dtype, shape) in self.fields.items()}
+
+        # NumPy versions of the packed entity ID list and the sparse list (-1 for no component),
+        # so that the slots of many entities can be looked up at once
+        self.entityIDArray = numpy.zeros(capacity, numpy.int64)
+        self.slotArray = numpy.full(capacity, -1, numpy.int64)
+
+    def getArrays(self):
+
+        '''
+        Gets the field arrays, trimmed to the number of stored components.
+        The arrays returned are views, so writing to them updates the stored data.
+        :return dict: Returns a dictionary mapping field names to arrays.
+        '''
+
+        count = len(self.components)
+        return {name: array[:count] for name, array in self.arrays.items()}
+
+    def add(self, entityID, component):
+
+        '''
+        Stores a component for an entity, replacing any existing component,
+        and copies the component's field values into the arrays.
+        :param int entityID: The ID of the entity.
+        :param ecs.ArrayComponent component: The component to store.
+        '''
+
+        # keep the data of a component being replaced
+        if self.contains(entityID):
+            self._unbindComponent(self._sparse[entityID])
+
+        # double the size of the arrays if full
+        index = self._sparse[entityID] if self.contains(entityID) else len(self.components)
+        if index >= self._capacity:
+            self._resizeArrays(self._capacity * 2)
+
+        # grow the sparse array if the entity ID doesn't fit
+        if entityID >= len(self.slotArray):
+            self.slotArray = self._resize(self.slotArray, max(entityID + 1, len(self.slotArray) * 2), -1)
+
+        # store the component in the packed lists
+        super().add(entityID, component)
+        self.entityIDArray[index] = entityID
+        self.slotArray[entityID] = index
+
+        # copy the component's values into the arrays
+        for name, array in self.arrays.items():
+            value = component._values.get(name)
+            array[index] = 0 if value is None else value
+
+        # field access now reads and writes the arrays
+        component._bind(self, entityID)
+
+    def addMany(self, entityIDs, components):
+
+        '''
+        Stores components for many entities, replacing any existing components.
+        :param list(int) entityIDs: The IDs of the entities.
+        :param list(ecs.ArrayComponent) components: The components to store, one for each entity.
+        '''
+
+        # each component's values are copied into the arrays separately
+        for entityID, component in zip(entityIDs, components):
+            self.add(entityID, component)
+
+    def remove(self, entityID):
+
+        '''
+        Removes the component stored for an entity, keeping the arrays packed
+        by moving the last row into the removed component's row.
+        :param int entityID: The ID of the entity.
+        :return ecs.ArrayComponent: Returns the removed component (or None if one doesn't exist).
+        '''
+
+        # nothing to remove if no component is stored
+        if self.contains(entityID) is False:
+            return None
+
+        # the removed component keeps a copy of its data
+        index = self._sparse[entityID]
+        self._unbindComponent(index)
+
+        # move the last row into the removed row
+        lastIndex = len(self.components) - 1
+        if index < lastIndex:
+            for array in self.arrays.values():
+                array[index] = array[lastIndex]
+            lastEntityID = self.entityIDs[lastIndex]
+            self.entityIDArray[index] = lastEntityID
+            self.slotArray[lastEntityID] = index
+        self.slotArray[entityID] = -1
+
+        # remove the component from the packed lists
+        return super().remove(entityID)
+
+    def _unbindComponent(self, index):
+
+        '''
+        Gives the component at a packed position a copy of its data
+        and stops it reading from the arrays.
+        :param int index: The packed position of the component.
+        '''
+
+        values = {name: array[index].copy() for name, array in self.arrays.items()}
+        self.components[index]._unbind(values)
+
+    def compact(self):
+
+        '''
+        Frees unused space, by shrinking the arrays to fit the stored components (keeping at least 16 rows),
+        and the sparse lists to fit the largest stored entity ID.
+        '''
+
+        super().compact()
+        capacity = max(len(self.components), 16)
+        if capacity < self._capacity:
+            self._resizeArrays(capacity)
+        if len(self._sparse) < len(self.slotArray):
+            self.slotArray = self._resize(self.slotArray, max(len(self._sparse), 1), -1)
+
+    def getMemoryUsage(self):
+
+        '''
+        Estimates the memory used by the storage, its components and its arrays.
+        :return int: Returns the estimated number of bytes.
+        '''
+
+        return super().getMemoryUsage() + self.entityIDArray.nbytes + self.slotArray.nbytes + \
+            sum(array.nbytes for array in self.arrays.values())
+
+    def _resizeArrays(self, capacity):
+
+        '''
+        Changes the number of rows in the field arrays and the packed entity ID array.
+        :param int capacity: The new number of rows.
+        '''
+
+        self._capacity = capacity
+        for name in self.arrays:
+            self.arrays[name] = self._resize(self.arrays[name], capacity, 0, name)
+        self.entityIDArray = self._resize(self.entityIDArray, capacity, 0, 'entityIDArray')
+
+    def _resize(self, array, size, fillValue, key = None):
+
+        '''
+        Creates a larger or smaller copy of an array.
+        :param numpy.ndarray array: The array to copy.
+        :param int size: The new number of rows.
+        :param any fillValue: The value of any new rows.
+        :param str key: The shared memory key of the array, if it should be shared (default = None).
+        :return numpy.ndarray: Returns the new array.
+        '''
+
+        oldSharedMemory = self._sharedMemory.get(key) if self._sharedMemory is not None else None
+        newArray = self._createArray((size,) + array.shape[1:], array.dtype, fillValue, key)
+        rows = min(len(array), size)
+        newArray[:rows] = array[:rows]
+
+        # the old shared memory is no longer needed
+        if oldSharedMemory is not None:
+            ArrayStorage._releaseSharedMemory(oldSharedMemory)
+
+        return newArray
+
+    #
+    # shared memory
+    #
+
+    def share(self):
+
+        '''
+        Moves the arrays into shared memory, if not already shared.
+        The shared memory is released when the storage is garbage collected.
+        '''
+
+        if self._sharedMemory is not None:
+            return
+
+        # copy each array into shared memory
+        self._sharedMemory = {}
+        for name, array in self.arrays.items():
+            self.arrays[name] = self._resize(array, len(array), 0, name)
+        self.entityIDArray = self._resize(self.entityIDArray, len(self.entityIDArray), 0, 'entityIDArray')
+
+        # release the shared memory when the storage is deleted (or at exit)
+        weakref.finalize(self, ArrayStorage._releaseAllSharedMemory, self._sharedMemory)
+
+    def isShared(self):
+
+        '''
+        :return bool: Returns True if the arrays are in shared memory.
+        '''
+
+        return self._sharedMemory is not None
+
+    def getSharedMemoryInfo(self):
+
+        '''
+        Gets the information needed to access the arrays from another process.
+        :return dict: Returns a dictionary mapping field names (and 'entityIDArray') to (shared memory name, dtype, shape) tuples.
+        '''
+
+        arrays = dict(self.arrays, entityIDArray = self.entityIDArray)
+        return {key: (self._sharedMemory[key].name, array.dtype.str, array.shape) for key, array in arrays.items()}
+
+    def _createArray(self, shape, dtype, fillValue, key = None):
+
+        '''
+        Creates a new array, in shared memory if the storage is shared.
+        :param tuple(int) shape: The shape of the array.
+        :param numpy.dtype dtype: The type of the array.
+        :param any fillValue: The initial value of the array.
+        :param str key: The shared memory key of the array (default = None, for an unshared array).
+        :return numpy.ndarray: Returns the new array.
+        '''
+
+        if self._sharedMemory is None or key is None:
+            return numpy.full(shape, fillValue, dtype)
+
+        # shared memory is only imported if used (Python 3.8+)
+        from multiprocessing import shared_memory
+
+        dtype = numpy.dtype(dtype)
+        sharedMemory = shared_memory.SharedMemory(create = True, size = max(1, int(numpy.prod(shape)) * dtype.itemsize))
+        self._sharedMemory[key] = sharedMemory
+        array = numpy.ndarray(shape, dtype, buffer = sharedMemory.buf)
+        array[...] = fillValue
+        return array
+
+    @staticmethod
+    def _releaseSharedMemory(sharedMemory):
+
+        '''
+        Releases a shared memory block.
+        :param multiprocessing.shared_memory.SharedMemory sharedMemory: The shared memory to release.
+        '''
+
+        # the memory is freed once no process is using it, but can't
+        # be closed yet if arrays (e.g. from getArrays()) still use it
+        sharedMemory.unlink()
+        try:
+            sharedMemory.close()
+        except BufferError:
+            pass
+
+    @staticmethod
+    def _releaseAllSharedMemory(sharedMemoryBlocks):
+
+        '''
+        Releases all shared memory blocks used by a storage.
+        :param dict sharedMemoryBlocks: The storage's shared memory blocks.
+        '''
+
+        for sharedMemory in sharedMemoryBlocks.values():
+            ArrayStorage._releaseSharedMemory(sharedMemory)
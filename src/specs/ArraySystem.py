@@ -0,0 +1,69 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+from .System import System
+from .ArrayComponent import ArrayComponent
+from .ArrayView import ArrayView
+
+class ArraySystem(System):
+
+    '''
+    A system that processes the array component data of all matched entities at once,
+    via the updateBatch() method, rather than calling a method for each entity.
+    updateBatch() is run by the system's updateEntities() method.
+    Requires NumPy.
+    '''
+
+    def updateEntities(self, scene, entities, deltaTime = 1):
+
+        '''
+        Runs updateBatch() for the entities matched in the scene (or only those whose
+        components have changed, if changed component types are specified), once per frame.
+        :param ecs.Scene scene: The scene running the method.
+        :param list(ecs.Entity) entities: The entities to process.
+        :param float deltaTime: The elapsed game time (default = 1).
+        '''
+
+        views = self.getViews(scene, entities)
+        if len(views) > 0:
+            self.updateBatch(scene, views, deltaTime)
+
+            # copied arrays need to be written back into the storage
+            for view in views.values():
+                view.writeBack()
+
+    def getViews(self, scene, entities = None):
+
+        '''
+        Gets the array component data for the entities in a scene that the system processes.
+        Row i of every view holds data for the same entity.
+        :param ecs.Scene scene: The scene containing the entities.
+        :param list(ecs.Entity) entities: The entities to include (default = None, for all entities the system processes).
+        :return dict: Returns a dictionary mapping each required ArrayComponent type to an ecs.ArrayView.
+        '''
+
+        # only required array component types have views
+        arrayComponentTypes = [t for t in self.requiredComponentTypeList if issubclass(t, ArrayComponent)]
+        if len(arrayComponentTypes) == 0:
+            return {}
+
+        # get the positions of the matched entities in each storage
+        storages = [scene.world.componentManager.getComponentStorage(t) for t in arrayComponentTypes]
+        if entities is None:
+            entities = scene._systemQueries[self].entities
+        slots = ArrayView.getSlots(entities, storages)
+
+        return {t: ArrayView(storage, s) for t, storage, s in zip(arrayComponentTypes, storages, slots)}
+
+    def updateBatch(self, scene, views, deltaTime = 1):
+
+        '''
+        This method is called once per frame, with the array component data
+        of all entities in the scene that the system processes.
+        :param ecs.Scene scene: The scene running the method.
+        :param dict views: A dictionary mapping each required ArrayComponent type to an ecs.ArrayView.
+        :param float deltaTime: The elapsed game time (default = 1).
+        '''
+
+        pass
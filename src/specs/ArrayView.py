@@ -0,0 +1,93 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+class ArrayView:
+
+    '''
+    The field arrays of an ArrayStorage for a set of entities, passed to ArraySystem.updateBatch().
+    Fields are accessed as attributes, e.g. view.position, and entityIDs holds the ID
+    of the entity for each row. If slots is None or a slice, the arrays are views of the storage.
+    Otherwise the arrays are copies, and are written back into the storage by writeBack().
+    :param ecs.ArrayStorage storage: The storage to view.
+    :param numpy.ndarray slots: The packed positions of the entities to include, or a slice (default = None, for all).
+    '''
+
+    def __init__(self, storage, slots = None):
+
+        # include all stored components if no positions are given
+        if slots is None:
+            slots = slice(0, len(storage))
+
+        self._storage = storage
+        self._slots = slots
+
+        # get the field arrays for the viewed entities
+        # (indexing with a slice creates views, and with positions creates copies)
+        self._arrays = {name: array[slots] for name, array in storage.arrays.items()}
+        self.entityIDs = storage.entityIDArray[slots]
+
+        # keep the original arrays, to detect fields that have been replaced
+        self._originalArrays = dict(self._arrays)
+
+    @staticmethod
+    def getSlots(entities, storages):
+
+        '''
+        Gets the packed positions of entities in one or more storages, such that
+        position i in each storage holds data for the same entity.
+        :param collection(ecs.Entity) entities: The entities, which must have a component in each storage.
+        :param list(ecs.ArrayStorage) storages: The storages.
+        :return list(numpy.ndarray): Returns the positions for each storage, or None instead of
+        positions that are all of the storage's components, in packed order.
+        '''
+
+        # if all components in the first storage belong to the entities,
+        # then the entities are in that storage's packed order
+        if len(entities) == len(storages[0]):
+            entityIDs = storages[0].entityIDArray[:len(storages[0])]
+            slots = [None]
+
+        # otherwise the IDs of the entities need to be collected
+        # (NumPy is imported here, as it's only required if array components are used)
+        else:
+            import numpy
+            entityIDs = numpy.fromiter((entity.ID for entity in entities), numpy.int64, len(entities))
+            slots = [storages[0].slotArray[entityIDs]]
+
+        # look up the slots of the entities in the other storages all at once
+        for storage in storages[1:]:
+            slots.append(storage.slotArray[entityIDs])
+
+        return slots
+
+    def __len__(self):
+
+        return len(self.entityIDs)
+
+    def __getattr__(self, name):
+
+        # only called for field names, as other attributes are found normally
+        arrays = self.__dict__.get('_arrays', {})
+        if name in arrays:
+            return arrays[name]
+        raise AttributeError('ArrayView has no field \'' + name + '\'.')
+
+    def __setattr__(self, name, value):
+
+        # replace a field array, which is written back into the storage
+        if '_arrays' in self.__dict__ and name in self._arrays:
+            self._arrays[name] = value
+        else:
+            object.__setattr__(self, name, value)
+
+    def writeBack(self):
+
+        '''
+        Writes the view's field arrays back into the storage.
+        This is only required for copied or replaced arrays.
+        '''
+
+        for name, array in self._arrays.items():
+            if isinstance(self._slots, slice) is False or array is not self._originalArrays[name]:
+                self._storage.arrays[name][self._slots] = array
@@ -0,0 +1,193 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+from .Entity import Entity
+
+class CommandBuffer:
+
+    '''
+    Records changes to entities (adding and removing components, adding entities to and
+    removing entities from the scene, and spawning and destroying entities) so that they can be made
+    safely while systems are processing entities. A scene's command buffer (scene.commands) is
+    flushed after each system updates (or after each stage, when using an ecs.Scheduler, where
+    each system in a stage records into its own buffer, flushed in the order the systems were added).
+    Changes are applied together when flushed, with components of each type added at once,
+    and the scene's queries updated once for each changed entity.
+    If a component type is added to and removed from the same entity, only the latest change is made.
+    :param ecs.Scene scene: The scene that spawned entities are added to.
+    '''
+
+    def __init__(self, scene):
+
+        self.scene = scene
+        self._clear()
+
+    def __len__(self):
+
+        return len(self._componentChanges) + len(self._addedEntities) + len(self._removedEntities) + \
+            len(self._destroyedEntities) + len(self._spawnedEntities)
+
+    def _clear(self):
+
+        # the latest component change for each (entity, component type),
+        # which is either a component to add, or None to remove the component type
+        self._componentChanges = {}
+
+        # entities to add to and remove from the scene, and to destroy
+        # (stored in insertion-ordered dicts, used as sets)
+        self._addedEntities = {}
+        self._removedEntities = {}
+        self._destroyedEntities = {}
+
+        # spawned entities, which are given their IDs when the buffer is flushed
+        self._spawnedEntities = []
+
+    def add(self, entity, component, *moreComponents):
+
+        '''
+        Adds one or more components to an entity when the buffer is flushed.
+        :param ecs.Entity entity: The entity to add the components to.
+        :param ecs.Component component: The component to add.
+        :param list(ecs.Component) moreComponents: Additional optional components to add.
+        '''
+
+        for component in [component] + list(moreComponents):
+            self._componentChanges[(entity, type(component))] = component
+
+    def remove(self, entity, componentType, *otherComponentTypes):
+
+        '''
+        Removes one or more component types from an entity when the buffer is flushed.
+        :param ecs.Entity entity: The entity to remove the components from.
+        :param type(ecs.Component) componentType: The type of component to remove.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types to remove.
+        '''
+
+        for componentType in [componentType] + list(otherComponentTypes):
+            self._componentChanges[(entity, componentType)] = None
+
+    def spawn(self, *components):
+
+        '''
+        Creates an entity when the buffer is flushed, which is then given its components and added to the scene.
+        The entity is returned straight away, so that it can be used in other commands, but it
+        isn't given an ID (and its components can't be used) until the buffer is flushed.
+        :param list(ecs.Component) components: The components to add to the entity.
+        :return ecs.Entity: Returns the entity to be created.
+        '''
+
+        # the ID is checked out when flushing, so that spawning doesn't change
+        # the entity manager while systems are running (possibly concurrently)
+        entity = Entity.__new__(Entity)
+        entity._setup(self.scene.world, None)
+        entity._spawnedBy = self
+        self._spawnedEntities.append(entity)
+        if len(components) > 0:
+            self.add(entity, *components)
+        self._addedEntities[entity] = None
+        return entity
+
+    def addEntity(self, entity):
+
+        '''
+        Adds an entity to the scene when the buffer is flushed.
+        :param ecs.Entity entity: The entity to add.
+        '''
+
+        self._removedEntities.pop(entity, None)
+        self._addedEntities[entity] = None
+
+    def removeEntity(self, entity):
+
+        '''
+        Removes an entity from the scene when the buffer is flushed.
+        :param ecs.Entity entity: The entity to remove.
+        '''
+
+        self._addedEntities.pop(entity, None)
+        self._removedEntities[entity] = None
+
+    def destroy(self, entity):
+
+        '''
+        Destroys an entity when the buffer is flushed (rather than at the end of the frame, as with Entity.destroy()).
+        :param ecs.Entity entity: The entity to destroy.
+        '''
+
+        self._destroyedEntities[entity] = None
+
+    def flush(self):
+
+        '''
+        Makes all recorded changes, in the following order: spawned entities are given IDs (in the order
+        they were spawned), components are added and removed (a component type at a time, in entity ID order),
+        entities are added to and removed from the scene, then entities are destroyed.
+        Changes to entities that have been destroyed are ignored.
+        Changes recorded while flushing are made in the next flush.
+        '''
+
+        if len(self) == 0:
+            return
+
+        # take the recorded changes, so that new changes can be recorded while flushing
+        componentChanges = self._componentChanges
+        addedEntities = self._addedEntities
+        removedEntities = self._removedEntities
+        destroyedEntities = self._destroyedEntities
+        spawnedEntities = self._spawnedEntities
+        self._clear()
+
+        # give the spawned entities their IDs
+        if len(spawnedEntities) > 0:
+            entityManager = self.scene.world.entityManager
+            IDs = entityManager.checkoutIDs(len(spawnedEntities))
+            if IDs is None:
+                raise Exception('Not enough Entity IDs available to spawn ' + str(len(spawnedEntities)) + ' entities.')
+            for entity, ID in zip(spawnedEntities, IDs):
+                entity.ID = ID
+                entity.generation = entityManager.getGeneration(ID)
+                del entity._spawnedBy
+
+        # group the component changes by type
+        componentManager = self.scene.world.componentManager
+        added = {}
+        removed = {}
+        for (entity, componentType), component in componentChanges.items():
+            if entity.isAlive() is False:
+                continue
+            if component is not None:
+                added.setdefault(componentType, []).append((entity, component))
+            else:
+                removed.setdefault(componentType, []).append(entity)
+
+        # add the components of each type at once, and remove components of each type
+        changedEntities = {}
+        for componentType, changes in added.items():
+            changes.sort(key = lambda change: change[0].ID)
+            entities = [entity for entity, _ in changes]
+            componentManager.addComponentsToEntities(entities, [component for _, component in changes])
+            changedEntities.update(dict.fromkeys(entities))
+        for componentType, entities in removed.items():
+            entities.sort(key = lambda entity: entity.ID)
+            for entity in entities:
+                if componentManager.removeComponentTypeFromEntity(entity, componentType) is not None:
+                    changedEntities[entity] = None
+
+        # update each scene's queries once, for all of the changed entities in the scene
+        sceneEntities = {}
+        for entity in changedEntities:
+            for scene in entity._scenes:
+                sceneEntities.setdefault(scene, []).append(entity)
+        for scene, entities in sceneEntities.items():
+            scene._onEntitiesChanged(entities)
+
+        # add and remove entities
+        if len(addedEntities) > 0:
+            self.scene.addEntities([entity for entity in addedEntities if entity.isAlive()])
+        for entity in removedEntities:
+            self.scene.removeEntity(entity)
+
+        # destroy entities
+        if len(destroyedEntities) > 0:
+            self.scene.world.entityManager.destroyEntities(sorted(destroyedEntities, key = lambda entity: entity.ID))
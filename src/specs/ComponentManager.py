@@ -2,29 +2,44 @@
 #  -- By Rik Cross
 #  -- MIT licenced, free to use, modify and distribute
 
+import sys
+from collections import OrderedDict
+
+from .ComponentStorage import ComponentStorage
+from .ArrayStorage import ArrayStorage
+from .ArrayComponent import ArrayComponent
+from .Component import Component
+from .TrackedComponent import TrackedComponent
+
 class ComponentManager:
     
     '''
     The ComponentManager assigns component types an ID, and stores
-    components for all entities in a [componentID][entityID] 2D array.
+    the components of each type in a separate sparse set.
+    There is no limit to the number of component types that can be registered.
     '''
 
     def __init__(self):
 
-        # TODO - how to avoid this circular dependency?
-        from .Globals import _entityManager
-
-        # the maximum different component types that can be registered
-        # this is required to determine the Entity/Component array size
-        self._maxComponentTypes = 100
-
         # a list of registered component types
         # the ID of a component type is its position in the list
         self._registeredComponentTypes = []
 
-        # a 2D array storing components for all entities
-        # access a component for an entity via _entityComponentMap[componentID][entityID]
-        self._entityComponentMap = [[None for _ in range(_entityManager._maxEntities)] for _ in range(self._maxComponentTypes)]
+        # a dictionary mapping registered component types to their IDs,
+        # so that component types can be looked up without scanning the list
+        self._componentTypeIDs = {}
+
+        # a list of component storages, one for each registered component type
+        # access a component for an entity via _componentStorages[componentID].get(entityID)
+        self._componentStorages = []
+
+        # a change log for each registered component type whose changes are tracked (or None),
+        # mapping entities to the tick at which their component last changed, oldest first
+        self._changeLogs = []
+
+        # the current change tick, which scenes increase before and after running
+        # each system, so that systems can find the components changed since they last ran
+        self._changeTick = 1
 
     def registerComponentType(self, componentType):
 
@@ -35,11 +50,25 @@ class ComponentManager:
         '''
         
         # register the component if not yet registered
-        if self.isComponentTypeRegistered(componentType) is False:
+        componentID = self._componentTypeIDs.get(componentType)
+        if componentID is None:
+            componentID = len(self._registeredComponentTypes)
             self._registeredComponentTypes.append(componentType)
+            self._componentTypeIDs[componentType] = componentID
+
+            # array components store their data in NumPy arrays
+            if isinstance(componentType, type) and issubclass(componentType, ArrayComponent):
+                self._componentStorages.append(ArrayStorage(componentType.fields))
+            else:
+                self._componentStorages.append(ComponentStorage())
+
+            # tracked components record their own changes
+            self._changeLogs.append(None)
+            if isinstance(componentType, type) and issubclass(componentType, TrackedComponent):
+                self.trackChanges(componentType)
             
         # return the ID of the component type
-        return self._registeredComponentTypes.index(componentType)
+        return componentID
     
     def isComponentTypeRegistered(self, componentType):
 
@@ -49,7 +78,36 @@ class ComponentManager:
         :return bool: Returns True if the component type is registered.
         '''
         
-        return componentType in self._registeredComponentTypes
+        return componentType in self._componentTypeIDs
+
+    def getComponentStorage(self, componentType):
+
+        '''
+        Gets the storage containing all components of the specified type,
+        which can be used to iterate through the components in packed order.
+        :param type(ecs.Component) componentType: The type of component.
+        :return ecs.ComponentStorage: Returns the storage for the type (or None if the type is not registered).
+        '''
+
+        componentID = self._componentTypeIDs.get(componentType)
+        if componentID is None:
+            return None
+        return self._componentStorages[componentID]
+
+    def getComponentTypeMask(self, componentType, *moreComponentTypes):
+
+        '''
+        Gets the bitmask for one or more component types, registering them if required.
+        The bit at position n is set for the component type with ID n.
+        :param type(ecs.Component) componentType: The component type to get the mask for.
+        :param list(type(ecs.Component)) moreComponentTypes: Additional optional component types to include.
+        :return int: Returns the combined bitmask of all specified component types.
+        '''
+
+        mask = 0
+        for t in [componentType] + list(moreComponentTypes):
+            mask |= 1 << self.registerComponentType(t)
+        return mask
 
     def hasComponent(self, entity, componentType):
         
@@ -61,9 +119,9 @@ class ComponentManager:
         '''
         
         # the component type must be registered and
-        # a component of that type should exist for the specified entity
-        return self.isComponentTypeRegistered(componentType) and \
-        self._entityComponentMap[self.getComponentTypeID(componentType)][entity.ID] is not None
+        # the entity's signature should include the component type's bit
+        componentID = self.getComponentTypeID(componentType)
+        return componentID is not None and (entity.signature >> componentID) & 1 == 1
 
     def getComponentForEntity(self, entity, componentType):
 
@@ -74,16 +132,18 @@ class ComponentManager:
         '''
         
         # return None for unregistered components
-        if componentType not in self._registeredComponentTypes:
+        componentID = self._componentTypeIDs.get(componentType)
+        if componentID is None:
             return None
         
-        # get the IDs for the entity and the component
-        entityID = entity.ID
-        componentID = self.getComponentTypeID(componentType)
-        
-        # use the IDs to access the component for the entity
-        # in the entityComponentMap 2D array
-        return self._entityComponentMap[componentID][entityID]
+        # get the component for the entity from the component type's storage
+        # (this is ComponentStorage.get() inlined, as it's called very often)
+        storage = self._componentStorages[componentID]
+        try:
+            index = storage._sparse[entity.ID]
+        except IndexError:
+            return None
+        return None if index is None else storage.components[index]
 
     def getComponentTypeID(self, componentType):
 
@@ -93,13 +153,9 @@ class ComponentManager:
         :return int: Returns the ID of the registered type, or None if type not registered.
         '''
         
-        # return None if the component type is not registered
-        if self.isComponentTypeRegistered(componentType) is False:
-            return None
-        
         # return the ID, which is the position of the component type
-        # in the known component types list
-        return self._registeredComponentTypes.index(componentType)
+        # in the known component types list (or None if not registered)
+        return self._componentTypeIDs.get(componentType)
 
     def addComponentToEntity(self, entity, component):
 
@@ -116,9 +172,18 @@ class ComponentManager:
         # only add known component types to entities
         if componentID is not None:
 
-            # add the component into the entityComponentMap 2D array
-            # the position of the component is [componentID][entityID]
-            self._entityComponentMap[componentID][entityID] = component
+            # add the component into the component type's storage
+            self._componentStorages[componentID].add(entityID, component)
+
+            # include the component type in the entity's signature
+            entity.signature |= 1 << componentID
+
+            # added components count as changed
+            changeLog = self._changeLogs[componentID]
+            if changeLog is not None:
+                self._logChange(changeLog, entity)
+                if isinstance(component, TrackedComponent):
+                    object.__setattr__(component, '_trackedBy', (self, entity))
 
             # run the component's onAddedToEntity callback if one exists
             if hasattr(component, 'onAddedToEntity'):
@@ -128,6 +193,51 @@ class ComponentManager:
         else:
             raise Exception('Cannot add', type(component), '- type not registered.')
     
+    def addComponentsToEntities(self, entities, components):
+
+        '''
+        Associates many components with many entities at once,
+        registering the component type if required.
+        :param list(ecs.Entity) entities: The entities to link the components to.
+        :param list(ecs.Component) components: The components to add, one for each entity.
+        '''
+
+        if len(components) == 0:
+            return
+
+        # components of different types are added one at a time
+        componentType = type(components[0])
+        if any(type(c) is not componentType for c in components):
+            for entity, component in zip(entities, components):
+                self.registerComponentType(type(component))
+                self.addComponentToEntity(entity, component)
+            return
+
+        # resolve the component type ID once
+        componentID = self.registerComponentType(componentType)
+
+        # add all components to the component type's storage
+        self._componentStorages[componentID].addMany([entity.ID for entity in entities], components)
+
+        # include the component type in all entity signatures
+        bit = 1 << componentID
+        for entity in entities:
+            entity.signature |= bit
+
+        # added components count as changed
+        changeLog = self._changeLogs[componentID]
+        if changeLog is not None:
+            for entity, component in zip(entities, components):
+                self._logChange(changeLog, entity)
+                if isinstance(component, TrackedComponent):
+                    object.__setattr__(component, '_trackedBy', (self, entity))
+
+        # run the components' onAddedToEntity callbacks, if they do something
+        callback = getattr(componentType, 'onAddedToEntity', None)
+        if callback is not None and callback is not Component.onAddedToEntity:
+            for entity, component in zip(entities, components):
+                component.onAddedToEntity(entity)
+
     def removeComponentTypeFromEntity(self, entity, componentType):
 
         '''
@@ -149,11 +259,131 @@ class ComponentManager:
             if hasattr(component, 'onRemovedFromEntity'):
                 component.onRemovedFromEntity(entity)
         
-            # remove the component from the entityComponentMap array
-            self._entityComponentMap[componentID][entityID] = None
+            # remove the component from the component type's storage
+            self._componentStorages[componentID].remove(entityID)
+
+            # remove the component type from the entity's signature
+            entity.signature &= ~(1 << componentID)
+
+            # forget any changes to the removed component
+            changeLog = self._changeLogs[componentID]
+            if changeLog is not None:
+                changeLog.pop(entity, None)
+                if isinstance(component, TrackedComponent):
+                    object.__setattr__(component, '_trackedBy', None)
 
         return component
 
+    #
+    # change tracking
+    #
+
+    def trackChanges(self, componentType, *otherComponentTypes):
+
+        '''
+        Starts tracking changes to one or more component types, registering them if required.
+        Changes are only recorded for tracked component types, so that other types have no extra cost.
+        Adding a component counts as a change, and TrackedComponent types are always tracked.
+        :param type(ecs.Component) componentType: The component type to track.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types to track.
+        '''
+
+        for componentType in [componentType] + list(otherComponentTypes):
+            componentID = self.registerComponentType(componentType)
+            if self._changeLogs[componentID] is None:
+                self._changeLogs[componentID] = OrderedDict()
+
+    def isTrackingChanges(self, componentType):
+
+        '''
+        :param type(ecs.Component) componentType: The component type to check.
+        :return bool: Returns True if changes to the component type are tracked.
+        '''
+
+        componentID = self._componentTypeIDs.get(componentType)
+        return componentID is not None and self._changeLogs[componentID] is not None
+
+    def markChanged(self, entity, componentType):
+
+        '''
+        Records that an entity's component of the specified type has changed.
+        Does nothing if the component type isn't tracked, or the entity doesn't have a component of the type.
+        :param ecs.Entity entity: The entity whose component has changed.
+        :param type(ecs.Component) componentType: The type of the changed component.
+        '''
+
+        componentID = self._componentTypeIDs.get(componentType)
+        if componentID is not None:
+            changeLog = self._changeLogs[componentID]
+            if changeLog is not None and (entity.signature >> componentID) & 1 == 1:
+                self._logChange(changeLog, entity)
+
+    def getChangedEntities(self, componentType, sinceTick):
+
+        '''
+        Gets the entities whose component of the specified type has changed after a tick.
+        Only the changed entities are checked, so this is fast when few components change.
+        :param type(ecs.Component) componentType: The type of component to check.
+        :param int sinceTick: The tick after which changes are included.
+        :return list(ecs.Entity): Returns the changed entities, in the order they last changed.
+        '''
+
+        componentID = self._componentTypeIDs.get(componentType)
+        if componentID is None or self._changeLogs[componentID] is None:
+            return []
+
+        # the log is in tick order, so read from the newest change back to the tick
+        changed = []
+        for entity, tick in reversed(self._changeLogs[componentID].items()):
+            if tick <= sinceTick:
+                break
+            changed.append(entity)
+        changed.reverse()
+        return changed
+
+    def advanceChangeTick(self):
+
+        '''
+        Increases the change tick, so that changes made from now on are after the returned tick.
+        Passing the returned tick to getChangedEntities() (or Query.getChanged()) later on gets the changes made since this call.
+        This shouldn't be called by systems running concurrently (see ecs.Scheduler).
+        :return int: Returns the tick before it was increased.
+        '''
+
+        tick = self._changeTick
+        self._changeTick += 1
+        return tick
+
+    def _logChange(self, changeLog, entity):
+
+        '''
+        Moves an entity to the end of a change log, with the current tick.
+        '''
+
+        changeLog[entity] = self._changeTick
+        changeLog.move_to_end(entity)
+
+    def compact(self):
+
+        '''
+        Frees unused space in all storages (e.g. after many entities have been destroyed).
+        '''
+
+        for storage in self._componentStorages:
+            storage.compact()
+
+    def getMemoryUsage(self):
+
+        '''
+        Estimates the memory used by the components of each type, including their storage and change log.
+        :return dict: Returns a dictionary mapping component type names to numbers of bytes.
+        '''
+
+        usage = {}
+        for componentType, storage, changeLog in zip(self._registeredComponentTypes, self._componentStorages, self._changeLogs):
+            usage[componentType.__name__] = storage.getMemoryUsage() + (sys.getsizeof(changeLog) if changeLog is not None else 0)
+        return usage
+
     def resetAllComponentsForEntity(self, entity):
 
         '''
@@ -161,11 +391,11 @@ class ComponentManager:
         :param ecs.Entity entity: The entity to reset.
         '''
 
-        # try to reset components of all registered types
-        for componentType in self._registeredComponentTypes:
+        # reset components of all types in the entity's signature
+        for componentID in self._getComponentTypeIDs(entity.signature):
             
             # get the component of the specified type
-            component = self.getComponentForEntity(entity, componentType)
+            component = self._componentStorages[componentID].get(entity.ID)
 
             # call reset method, if one exists
             if component is not None and hasattr(component, 'reset'):
@@ -179,6 +409,21 @@ class ComponentManager:
         '''
 
         # call existing remove component type method
-        # for all registered component types
-        for componentType in self._registeredComponentTypes:
-            self.removeComponentTypeFromEntity(entity, componentType)
\ No newline at end of file
+        # for all component types in the entity's signature
+        for componentID in self._getComponentTypeIDs(entity.signature):
+            self.removeComponentTypeFromEntity(entity, self._registeredComponentTypes[componentID])
+
+    def _getComponentTypeIDs(self, signature):
+
+        '''
+        Gets the component type IDs included in a signature.
+        :param int signature: The component type bitmask.
+        :return list(int): Returns the IDs of the set bits, lowest first.
+        '''
+
+        componentIDs = []
+        while signature != 0:
+            lowestBit = signature & -signature
+            componentIDs.append(lowestBit.bit_length() - 1)
+            signature ^= lowestBit
+        return componentIDs
@@ -0,0 +1,179 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+import sys
+
+def _getComponentSize(component):
+
+    '''
+    Estimates the memory used by a component object, including its attribute dictionary
+    (but not the values of its attributes).
+    :param ecs.Component component: The component.
+    :return int: Returns the estimated number of bytes.
+    '''
+
+    size = sys.getsizeof(component)
+    attributes = getattr(component, '__dict__', None)
+    if attributes is not None:
+        size += sys.getsizeof(attributes)
+    return size
+
+class ComponentStorage:
+
+    '''
+    Stores all components of a single type as a sparse set.
+    Components are kept in a packed (dense) list, alongside a packed list of the
+    IDs of the entities they belong to. A sparse list maps entity IDs to positions
+    in the packed lists, and grows on demand as larger entity IDs are used.
+    '''
+
+    def __init__(self):
+
+        # the packed lists of components and their entity IDs,
+        # where components[i] belongs to the entity with ID entityIDs[i]
+        self.components = []
+        self.entityIDs = []
+
+        # the sparse list mapping an entity ID to a position
+        # in the packed lists (or None if the entity has no component)
+        self._sparse = []
+
+    def __len__(self):
+
+        return len(self.components)
+
+    def __iter__(self):
+
+        '''
+        Iterates through all stored components, in packed order.
+        :return iter((int, ecs.Component)): Yields (entity ID, component) pairs.
+        '''
+
+        return zip(self.entityIDs, self.components)
+
+    def contains(self, entityID):
+
+        '''
+        Checks whether a component is stored for an entity.
+        :param int entityID: The ID of the entity to check.
+        :return bool: Returns True if a component is stored for the entity.
+        '''
+
+        return entityID < len(self._sparse) and self._sparse[entityID] is not None
+
+    def get(self, entityID):
+
+        '''
+        Gets the component stored for an entity.
+        :param int entityID: The ID of the entity.
+        :return ecs.Component: Returns the stored component (or None if one doesn't exist).
+        '''
+
+        try:
+            index = self._sparse[entityID]
+        except IndexError:
+            return None
+        return None if index is None else self.components[index]
+
+    def add(self, entityID, component):
+
+        '''
+        Stores a component for an entity, replacing any existing component.
+        :param int entityID: The ID of the entity.
+        :param ecs.Component component: The component to store.
+        '''
+
+        # grow the sparse list (at least doubling it) if the ID doesn't fit
+        if entityID >= len(self._sparse):
+            newSize = max(entityID + 1, len(self._sparse) * 2)
+            self._sparse.extend([None] * (newSize - len(self._sparse)))
+
+        # replace an existing component
+        index = self._sparse[entityID]
+        if index is not None:
+            self.components[index] = component
+
+        # or add the component to the end of the packed lists
+        else:
+            self._sparse[entityID] = len(self.components)
+            self.components.append(component)
+            self.entityIDs.append(entityID)
+
+    def addMany(self, entityIDs, components):
+
+        '''
+        Stores components for many entities at once, replacing any existing components.
+        :param list(int) entityIDs: The IDs of the entities.
+        :param list(ecs.Component) components: The components to store, one for each entity.
+        '''
+
+        # grow the sparse list once, to fit the largest ID
+        if len(entityIDs) > 0 and max(entityIDs) >= len(self._sparse):
+            newSize = max(max(entityIDs) + 1, len(self._sparse) * 2)
+            self._sparse.extend([None] * (newSize - len(self._sparse)))
+
+        # replace existing components one at a time
+        sparse = self._sparse
+        if any(sparse[entityID] is not None for entityID in entityIDs):
+            for entityID, component in zip(entityIDs, components):
+                self.add(entityID, component)
+            return
+
+        # otherwise add all components to the end of the packed lists
+        start = len(self.components)
+        for index, entityID in enumerate(entityIDs, start):
+            sparse[entityID] = index
+        self.components.extend(components)
+        self.entityIDs.extend(entityIDs)
+
+    def remove(self, entityID):
+
+        '''
+        Removes the component stored for an entity, keeping the lists packed
+        by moving the last component into the removed component's position.
+        :param int entityID: The ID of the entity.
+        :return ecs.Component: Returns the removed component (or None if one doesn't exist).
+        '''
+
+        # nothing to remove if no component is stored
+        if self.contains(entityID) is False:
+            return None
+
+        index = self._sparse[entityID]
+        component = self.components[index]
+
+        # move the last component into the removed position
+        lastComponent = self.components.pop()
+        lastEntityID = self.entityIDs.pop()
+        if index < len(self.components):
+            self.components[index] = lastComponent
+            self.entityIDs[index] = lastEntityID
+            self._sparse[lastEntityID] = index
+
+        self._sparse[entityID] = None
+        return component
+
+    def compact(self):
+
+        '''
+        Frees unused space, by shortening the sparse list to fit the largest stored entity ID.
+        '''
+
+        size = max(self.entityIDs) + 1 if len(self.entityIDs) > 0 else 0
+        del self._sparse[size:]
+
+        # copying the packed lists frees any space left over from removed components
+        self._sparse = list(self._sparse)
+        self.components = list(self.components)
+        self.entityIDs = list(self.entityIDs)
+
+    def getMemoryUsage(self):
+
+        '''
+        Estimates the memory used by the storage and its components.
+        :return int: Returns the estimated number of bytes.
+        '''
+
+        return sys.getsizeof(self.components) + sys.getsizeof(self.entityIDs) + sys.getsizeof(self._sparse) + \
+            sum(_getComponentSize(component) for component in self.components)
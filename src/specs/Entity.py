@@ -2,7 +2,7 @@
 #  -- By Rik Cross
 #  -- MIT licenced, free to use, modify and distribute
 
-from .Globals import _entityManager, _componentManager
+from .Globals import getDefaultWorld
 
 class Entity:
 
@@ -10,31 +10,107 @@ class Entity:
     An entity is really just an ID used to group a collection of components.
     :param ecs.Component component: An optional component to add to the entity.
     :param list(ecs.Component) moreComponents: Additional optional components to add to the entity.
+    :param ecs.World world: The world to create the entity in (default = None, for the default world).
     '''
 
-    def __init__(self, component = None, *moreComponents):
+    def __init__(self, component = None, *moreComponents, world = None):
 
-        # get an available ID from the entity manager
+        if world is None:
+            world = getDefaultWorld()
+
+        # get an available ID from the world's entity manager
         # and assign it to the entity (if an ID is available)
-        ID = _entityManager.checkoutID()
+        ID = world.entityManager.checkoutID()
         if ID is None:
             raise Exception('No Entity ID available, maximum number of entities created.')
-        self.ID = ID
+        self._setup(world, ID)
 
         # add any specified components to the entity
         for c in [component] + list(moreComponents):
-            self.addComponent(c)
+            if c is not None:
+                self.addComponent(c)
+
+    def _setup(self, world, ID):
+
+        '''
+        Initialises the entity's attributes, for an entity with no components.
+        :param ecs.World world: The world the entity belongs to.
+        :param int ID: The ID checked out for the entity (or None for an entity spawned using an ecs.CommandBuffer,
+        which is given its ID when the buffer is flushed).
+        '''
+
+        self.world = world
+        self.ID = ID
+
+        # the world's managers, which are used by most entity methods
+        self._entityManager = world.entityManager
+        self._componentManager = world.componentManager
+
+        # the generation of the ID, used to detect handles
+        # to entities whose ID has since been reused
+        self.generation = world.entityManager.getGeneration(ID) if ID is not None else None
+
+        # the scenes that the entity has been added to (as a dict used as a set),
+        # which are notified whenever the entity's components or active state change
+        self._scenes = {}
 
         # systems only process active entities
-        self.active = True
+        self._active = True
+
+        # a bitmask of the component types the entity has, where the bit
+        # at position n is set if the entity has a component with type ID n
+        self.signature = 0
 
-        # a scene deletes entities with _markedForDeletion = True
-        # at the end of each game loop, which avoids 
+        # entities marked for deletion are destroyed
+        # once all systems have finished processing entities
         self._markedForDeletion = False
-        self.tags = []
 
-        # add the entity to the entity manager's list of all entities
-        #entityManager.entities.append(self)
+        # the entity's tags, which scenes also index
+        self.tags = set()
+
+    @classmethod
+    def createMany(cls, count, *componentSources, world = None):
+
+        '''
+        Creates many entities at once, which is much faster than creating them one at a time.
+        Each component source provides one component type for all of the entities, either as
+        a list of components (one per entity), or a function that takes the index of an entity
+        (from 0 to count - 1) and returns its component.
+        :param int count: The number of entities to create.
+        :param list(list(ecs.Component) or function) componentSources: The components to add to the entities.
+        :param ecs.World world: The world to create the entities in (default = None, for the default world).
+        :return list(ecs.Entity): Returns the created entities.
+        '''
+
+        if world is None:
+            world = getDefaultWorld()
+
+        # get the components from each source first, so that no IDs
+        # are checked out if a source is invalid or raises an exception
+        componentLists = []
+        for source in componentSources:
+            components = [source(i) for i in range(count)] if callable(source) else list(source)
+            if len(components) != count:
+                raise Exception('Expected ' + str(count) + ' components, got ' + str(len(components)) + '.')
+            componentLists.append(components)
+
+        # get all of the IDs at once
+        IDs = world.entityManager.checkoutIDs(count)
+        if IDs is None:
+            raise Exception('Not enough Entity IDs available to create ' + str(count) + ' entities.')
+
+        # create the entities without running __init__()
+        entities = []
+        for ID in IDs:
+            entity = cls.__new__(cls)
+            entity._setup(world, ID)
+            entities.append(entity)
+
+        # add the components from each source
+        for components in componentLists:
+            world.componentManager.addComponentsToEntities(entities, components)
+
+        return entities
 
     #
     # core
@@ -47,7 +123,65 @@ class Entity:
         which will happen after each system has finished processing entities.
         '''
         
-        self._markedForDeletion = True
+        # only queue the entity once
+        if self._markedForDeletion is False:
+            self._markedForDeletion = True
+
+            # entities spawned using a command buffer are destroyed once they have been created
+            if self.ID is None:
+                self._spawnedBy.destroy(self)
+            else:
+                self._entityManager.queueDestroy(self)
+
+    def isAlive(self):
+
+        '''
+        Checks whether the entity still exists. Entities no longer
+        exist once their ID has been returned to the entity manager.
+        :return bool: Returns True if the entity still exists.
+        '''
+
+        return self.ID is not None and self._entityManager.isAlive(self.ID, self.generation)
+
+    def _checkAlive(self):
+
+        '''
+        Raises an exception if the entity no longer exists, so that
+        a stale entity can't access the components of a newer entity using the same ID.
+        '''
+
+        if self.ID is None:
+            raise Exception('Entity has not been created yet (spawned entities are created when the command buffer is flushed).')
+        if self._entityManager.isAlive(self.ID, self.generation) is False:
+            raise Exception('Entity ' + str(self.ID) + ' no longer exists.')
+
+    @property
+    def active(self):
+
+        '''
+        Systems only process active entities.
+        :return bool: Returns True if the entity is active.
+        '''
+
+        return self._active
+
+    @active.setter
+    def active(self, value):
+
+        # only notify scenes if the state has actually changed
+        if value != self._active:
+            self._active = value
+            self._notifyScenes()
+
+    def _notifyScenes(self):
+
+        '''
+        Lets each scene containing the entity know that the entity
+        has changed, so that cached queries can be updated.
+        '''
+
+        for scene in self._scenes:
+            scene._onEntityChanged(self)
 
     #
     # tags
@@ -61,12 +195,14 @@ class Entity:
         :param list(str) moreTags: Additional optional tags to add to the entity.
         '''
         
-        # add each tag specified
-        for t in [tag] + list(moreTags):
-            # only add a tag is not already present
-        
-            if self.hasTag(t) is False:
-                self.tags.append(t)
+        # only add tags that are not already present
+        addedTags = [t for t in (tag,) + moreTags if t not in self.tags]
+        if len(addedTags) > 0:
+            self.tags.update(addedTags)
+
+            # let scenes update their tag indexes and queries
+            for scene in self._scenes:
+                scene._onEntityTagsChanged(self, addedTags, ())
 
     def hasTag(self, tag, *moreTags):
         
@@ -77,11 +213,13 @@ class Entity:
         :return bool: Returns True if the entity has all tags.
         '''
         
-        # create a list of all tags to check
-        tags = [tag] + list(moreTags)
-        
-        # tags are all contained in self.tags if it is a subset
-        return set(tags).issubset(self.tags)
+        # check each tag, without creating a set for a single tag
+        if tag not in self.tags:
+            return False
+        for t in moreTags:
+            if t not in self.tags:
+                return False
+        return True
 
     def removeTag(self, tag, *moreTags):
         
@@ -91,10 +229,14 @@ class Entity:
         :param list(str) moreTags: Additional optional tags to remove from the entity.
         '''
         
-        # remove all tags if they exist
-        for t in [tag] + list(moreTags):
-            if t in self.tags:
-                self.tags.remove(t)
+        # only remove tags that exist
+        removedTags = [t for t in (tag,) + moreTags if t in self.tags]
+        if len(removedTags) > 0:
+            self.tags.difference_update(removedTags)
+
+            # let scenes update their tag indexes and queries
+            for scene in self._scenes:
+                scene._onEntityTagsChanged(self, (), removedTags)
 
     #
     # components
@@ -107,13 +249,18 @@ class Entity:
         :param ecs.Component component: The component to add.
         '''
         
+        self._checkAlive()
+
         # a component will need to be registered the first time a component
         # of a particular type is added to an entity
-        if _componentManager.isComponentTypeRegistered(type(component)) is False:
-            _componentManager.registerComponentType(type(component))
+        if self._componentManager.isComponentTypeRegistered(type(component)) is False:
+            self._componentManager.registerComponentType(type(component))
         
         # add the component using the component manager
-        _componentManager.addComponentToEntity(self, component)
+        self._componentManager.addComponentToEntity(self, component)
+
+        # the entity may now match more systems
+        self._notifyScenes()
 
     def hasComponent(self, componentType):
 
@@ -122,8 +269,10 @@ class Entity:
         :return bool: Returns True if the entity has a component of the specified type.
         '''
         
+        self._checkAlive()
+
         # check if the component exists for the entity via the component manager
-        return _componentManager.hasComponent(self, componentType)
+        return self._componentManager.hasComponent(self, componentType)
 
     def getComponent(self, componentType):
 
@@ -133,8 +282,31 @@ class Entity:
         :return ecs.Component: Returns the component of the specified type, or None if no component exists.
         '''
         
-        # get the component stored in the component manager 2D array
-        return _componentManager.getComponentForEntity(self, componentType)
+        # stale (and not yet spawned) entities can't access components
+        # (the IDs of stale entities may have been removed by EntityManager.compact())
+        try:
+            stale = self._entityManager._generations[self.ID] != self.generation
+        except (IndexError, TypeError):
+            stale = True
+        if stale:
+            self._checkAlive()
+
+        # get the component stored in the component manager
+        return self._componentManager.getComponentForEntity(self, componentType)
+
+    def markChanged(self, componentType, *otherComponentTypes):
+
+        '''
+        Records that one or more of the entity's components have changed, so that they are included
+        when systems and queries ask for changed components (if the component types are tracked).
+        :param type(ecs.Component) componentType: The type of the changed component.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional changed component types.
+        '''
+
+        self._checkAlive()
+
+        for componentType in [componentType] + list(otherComponentTypes):
+            self._componentManager.markChanged(self, componentType)
 
     def resetAllComponents(self):
 
@@ -142,8 +314,10 @@ class Entity:
         Runs the reset() method for all components.
         '''
         
+        self._checkAlive()
+
         # defer to the component manager to reset all components for the entity
-        _componentManager.resetAllComponentsForEntity(self)
+        self._componentManager.resetAllComponentsForEntity(self)
 
     def removeComponent(self, componentType):
 
@@ -152,8 +326,13 @@ class Entity:
         :param type(ecs.Component) componentType: The type of the component to remove.
         '''
         
+        self._checkAlive()
+
         # defer to the component manager to remove and return the component
-        _componentManager.removeComponentTypeFromEntity(self, componentType)
+        self._componentManager.removeComponentTypeFromEntity(self, componentType)
+
+        # the entity may now match fewer systems
+        self._notifyScenes()
 
     def removeAllComponents(self):
 
@@ -161,5 +340,10 @@ class Entity:
         Removes all components.
         '''
         
+        self._checkAlive()
+
         # defer to the component manager to remove all components
-        _componentManager.removeAllComponentsForEntity(self)
\ No newline at end of file
+        self._componentManager.removeAllComponentsForEntity(self)
+
+        # the entity may now match fewer systems
+        self._notifyScenes()
@@ -2,37 +2,142 @@
 #  -- By Rik Cross
 #  -- MIT licenced, free to use, modify and distribute
 
+import heapq
+import sys
+
 class EntityManager:
 
     '''
     Manages a list of entities and associated entity IDs.
+    Each ID has a generation, which increases every time the ID is returned,
+    so that handles to entities whose IDs have been reused can be detected.
+    Room is made for a number of IDs up front, and the space for IDs doubles whenever more are needed.
+    :param int capacity: The number of IDs to make room for up front (default = 1000).
+    :param int maxEntities: The maximum number of entities that can exist at once (default = None, for no maximum).
     '''
     
-    def __init__(self):
+    def __init__(self, capacity = 1000, maxEntities = None):
+
+        # set the maximum number of entities allowed (if any)
+        self._maxEntities = maxEntities
+
+        # compact() doesn't reduce the space for IDs below the initial capacity
+        self._minimumCapacity = capacity
+
+        # IDs that have never been used are handed out in order,
+        # starting from _nextID
+        self._nextID = 0
+
+        # a min-heap of IDs that have been returned, so
+        # that the smallest available ID is always handed out first
+        self._freeIDs = []
+
+        # the generation of each ID (room is made for the IDs up front), and whether it is currently
+        # available (only IDs below _nextID have been used, so other IDs are never checked)
+        self._generations = [0] * capacity
+        self._available = bytearray(capacity)
+
+        # the generation of IDs that are made room for after compact() has
+        # removed IDs, so that handles using the removed IDs remain invalid
+        self._baseGeneration = 0
+
+        # entities waiting to be destroyed at the end of the frame
+        self._destroyQueue = []
+
+    @property
+    def IDPool(self):
+
+        '''
+        All available IDs, in the order they will be handed out
+        (up to the maximum number of entities, or the current capacity if there is no maximum).
+        :return list(int): Returns a sorted list of available IDs.
+        '''
+
+        return sorted(self._freeIDs) + list(range(self._nextID, self._maxEntities if self._maxEntities is not None else self.capacity))
+
+    @property
+    def capacity(self):
+
+        '''
+        The number of IDs there is currently room for, without needing more space.
+        :return int: Returns the capacity.
+        '''
+
+        return len(self._generations)
+
+    def reserve(self, capacity):
+
+        '''
+        Makes room for a number of IDs, so that no more space is needed until they have been used.
+        :param int capacity: The total number of IDs to make room for.
+        '''
+
+        if capacity > len(self._generations):
+            growth = capacity - len(self._generations)
+            self._generations.extend([self._baseGeneration] * growth)
+            self._available.extend(bytes(growth))
 
-        # set the maximum number of entities allowed
-        # (this number is used to create the IDs in the ID pool)
-        self._maxEntities = 1000
+    def _grow(self, capacity):
+
+        '''
+        Makes room for at least a number of IDs, at least doubling the space for IDs.
+        :param int capacity: The total number of IDs needed.
+        '''
 
-        # the ID pool is the place that available IDs are taken from
-        # and is just a list of numbers from 0 --> _maxEntities
-        self.IDPool = [x for x in range(self._maxEntities)]
+        self.reserve(max(capacity, len(self._generations) * 2))
 
     def checkoutID(self):
 
         '''
         Get the next available ID from the pool for assigning to an entity.
-        :return int: Returns the first (smallest) number from the ID pool.
+        :return int: Returns the smallest available ID (or None if no ID is available).
         '''
         
-        # get the first (lowest) number from the pool
-        if len(self.IDPool) > 0:
-            return self.IDPool.pop(0)
-        
+        # reuse the smallest returned ID
+        if len(self._freeIDs) > 0:
+            ID = heapq.heappop(self._freeIDs)
+            self._available[ID] = 0
+            return ID
+
+        # or use a new ID, making more room for IDs if required
+        if self._maxEntities is None or self._nextID < self._maxEntities:
+            ID = self._nextID
+            if ID >= len(self._generations):
+                self._grow(ID + 1)
+            self._nextID += 1
+            self._available[ID] = 0
+            return ID
+
         # return None if no ID is available
-        else:
+        return None
+
+    def checkoutIDs(self, count):
+
+        '''
+        Get many IDs from the pool at once.
+        :param int count: The number of IDs to get.
+        :return list(int): Returns the smallest available IDs (or None if not enough IDs are available).
+        '''
+
+        # check that enough IDs are available first
+        if self._maxEntities is not None and len(self._freeIDs) + self._maxEntities - self._nextID < count:
             return None
 
+        # reuse returned IDs first, smallest first
+        IDs = [heapq.heappop(self._freeIDs) for _ in range(min(count, len(self._freeIDs)))]
+        for ID in IDs:
+            self._available[ID] = 0
+
+        # then use new IDs, making more room for IDs if required
+        newIDCount = count - len(IDs)
+        if self._nextID + newIDCount > len(self._generations):
+            self._grow(self._nextID + newIDCount)
+        IDs.extend(range(self._nextID, self._nextID + newIDCount))
+        self._available[self._nextID:self._nextID + newIDCount] = bytes(newIDCount)
+        self._nextID += newIDCount
+
+        return IDs
+
     def checkinID(self, ID):
         
         '''
@@ -40,11 +145,116 @@ class EntityManager:
         :param int ID: The ID to return to the pool
         '''
 
-        # only return an ID if it's not already in the pool
-        if ID not in self.IDPool:
+        # only return an ID if it's in use
+        if ID < self._nextID and self._available[ID] == 0:
+
+            # handles using the old generation are no longer valid
+            self._generations[ID] += 1
+            self._available[ID] = 1
 
             # add the ID back into the pool
-            self.IDPool.append(ID)        
-            
-            # sort the available IDs, so that they are assigned in low --> high order
-            self.IDPool.sort()
\ No newline at end of file
+            heapq.heappush(self._freeIDs, ID)
+
+    def getGeneration(self, ID):
+
+        '''
+        Gets the current generation of an ID.
+        :param int ID: The ID to check.
+        :return int: Returns the number of times the ID has been returned to the pool.
+        '''
+
+        return self._generations[ID] if ID < self._nextID else 0
+
+    def isAlive(self, ID, generation):
+
+        '''
+        Checks whether an ID and generation refer to an entity that still exists.
+        :param int ID: The entity ID.
+        :param int generation: The generation of the ID when the entity was created.
+        :return bool: Returns True if the ID is in use and has not been returned since.
+        '''
+
+        return ID < self._nextID and self._available[ID] == 0 and self._generations[ID] == generation
+
+    def compact(self):
+
+        '''
+        Frees the space used by the highest unused IDs (e.g. after many entities have been destroyed),
+        down to the initial capacity. IDs of existing entities are not changed.
+        '''
+
+        # find the highest ID in use
+        nextID = self._nextID
+        while nextID > 0 and self._available[nextID - 1] == 1:
+            nextID -= 1
+
+        # forget the unused IDs above it, making sure that the IDs are
+        # given a higher generation than any handle using them
+        if nextID < self._nextID:
+            self._baseGeneration = max(self._baseGeneration, max(self._generations[nextID:self._nextID]))
+            self._freeIDs = [ID for ID in self._freeIDs if ID < nextID]
+            heapq.heapify(self._freeIDs)
+            self._nextID = nextID
+
+        # free the space for IDs above the larger of the initial capacity and the highest ID in use
+        capacity = max(nextID, self._minimumCapacity)
+        if capacity < len(self._generations):
+            del self._generations[capacity:]
+            del self._available[capacity:]
+
+    def getMemoryUsage(self):
+
+        '''
+        Estimates the memory used to manage IDs.
+        :return int: Returns the estimated number of bytes.
+        '''
+
+        return sys.getsizeof(self._generations) + sys.getsizeof(self._available) + \
+            sys.getsizeof(self._freeIDs) + sys.getsizeof(self._destroyQueue)
+
+    def queueDestroy(self, entity):
+
+        '''
+        Adds an entity to the queue of entities to destroy when destroyQueuedEntities() is next called.
+        :param ecs.Entity entity: The entity to destroy.
+        '''
+
+        self._destroyQueue.append(entity)
+
+    def destroyQueuedEntities(self):
+
+        '''
+        Destroys all queued entities, by removing them from their scenes,
+        removing all of their components and returning their IDs to the pool.
+        '''
+
+        # entities destroyed during this method are queued for next time
+        queue = self._destroyQueue
+        self._destroyQueue = []
+
+        self.destroyEntities(queue)
+
+    def destroyEntities(self, entities):
+
+        '''
+        Destroys entities immediately, by removing them from their scenes,
+        removing all of their components and returning their IDs to the pool.
+        Entities that have already been destroyed (or spawned entities that haven't yet been created) are ignored.
+        :param list(ecs.Entity) entities: The entities to destroy.
+        '''
+
+        for entity in entities:
+
+            # an entity may have been destroyed since it was queued
+            if entity.ID is None or self.isAlive(entity.ID, entity.generation) is False:
+                continue
+
+            # remove the entity from only the scenes it has been added to
+            for scene in list(entity._scenes):
+                scene._detachEntity(entity)
+
+            # remove all components
+            entity.removeAllComponents()
+
+            # the ID can now be reused by new entities
+            self.checkinID(entity.ID)
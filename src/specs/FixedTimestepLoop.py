@@ -0,0 +1,123 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+import time
+
+class FixedTimestepLoop:
+
+    '''
+    Runs a scene's update() method at a fixed rate, independent of the frame rate.
+    Elapsed time is added to an accumulator, and the scene is updated once for each whole
+    step in the accumulator, always with a deltaTime of stepTime. The number of updates per
+    call to advance() is limited, so that a slow frame doesn't cause more and more updates
+    (the 'spiral of death'). The fraction of a step left in the accumulator is stored in
+    scene.interpolation before drawing, so that draw systems can interpolate.
+    :param ecs.Scene scene: The scene to update.
+    :param float stepTime: The time between updates, in seconds (default = 1/60).
+    :param int maxSubsteps: The maximum number of updates per call to advance() (default = 5).
+    '''
+
+    def __init__(self, scene, stepTime = 1 / 60, maxSubsteps = 5):
+
+        self.scene = scene
+        self.stepTime = stepTime
+        self.maxSubsteps = maxSubsteps
+
+        # elapsed time not yet used by an update
+        self.accumulator = 0.0
+
+        # the total number of updates run, and the total time
+        # discarded when more than maxSubsteps updates were due
+        self.steps = 0
+        self.droppedTime = 0.0
+
+        # set to False to stop run()
+        self.running = False
+
+    @property
+    def alpha(self):
+
+        '''
+        How far the scene is between the last update and the next one.
+        :return float: Returns a value from 0 to 1.
+        '''
+
+        return self.accumulator / self.stepTime
+
+    def advance(self, elapsedTime, maxSubsteps = None):
+
+        '''
+        Adds elapsed time to the accumulator, and updates the scene for each whole step.
+        :param float elapsedTime: The time since the last call, in seconds.
+        :param int maxSubsteps: The maximum number of updates to run, if fewer than
+        self.maxSubsteps (default = None, for self.maxSubsteps). Steps not run because of this limit are kept.
+        :return int: Returns the number of updates run.
+        '''
+
+        self.accumulator += elapsedTime
+
+        # run an update for each whole step, up to the maximum
+        limit = self.maxSubsteps if maxSubsteps is None else min(maxSubsteps, self.maxSubsteps)
+        substeps = 0
+        while self.accumulator >= self.stepTime and substeps < limit:
+            self.scene.update(self.stepTime)
+            self.accumulator -= self.stepTime
+            substeps += 1
+        self.steps += substeps
+
+        # discard any whole steps that couldn't be run because more than self.maxSubsteps were due
+        if substeps == self.maxSubsteps and self.accumulator >= self.stepTime:
+            dropped = self.accumulator - (self.accumulator % self.stepTime)
+            self.droppedTime += dropped
+            self.accumulator -= dropped
+
+        self.scene.interpolation = self.alpha
+        return substeps
+
+    def draw(self, surface = None):
+
+        '''
+        Draws the scene, with scene.interpolation set to the current alpha value.
+        :param any surface: The (optional) surface to draw to (default = None).
+        '''
+
+        self.scene.interpolation = self.alpha
+        self.scene.draw(surface)
+
+    def run(self, maxSteps = None, surface = None, draw = False):
+
+        '''
+        Runs the loop in real time until stop() is called (or maxSteps updates have run),
+        sleeping until the next update is due rather than repeatedly checking the time.
+        :param int maxSteps: The number of updates to run before stopping (default = None, for no limit).
+        :param any surface: The surface to draw to, if drawing (default = None).
+        :param bool draw: Draws the scene after each update, if True (default = False).
+        '''
+
+        self.running = True
+        previousTime = time.perf_counter()
+        while self.running and (maxSteps is None or self.steps < maxSteps):
+
+            # update the scene for the elapsed time, without running more than maxSteps updates
+            currentTime = time.perf_counter()
+            self.advance(currentTime - previousTime, None if maxSteps is None else maxSteps - self.steps)
+            previousTime = currentTime
+
+            if draw is True:
+                self.draw(surface)
+
+            # wait until the next update is due
+            timeUntilNextStep = self.stepTime - self.accumulator - (time.perf_counter() - currentTime)
+            if timeUntilNextStep > 0:
+                time.sleep(timeUntilNextStep)
+
+        self.running = False
+
+    def stop(self):
+
+        '''
+        Stops run() after the current frame.
+        '''
+
+        self.running = False
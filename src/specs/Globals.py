@@ -2,10 +2,50 @@
 #  -- By Rik Cross
 #  -- MIT licenced, free to use, modify and distribute
 
-# import the manager class definitions
-from .EntityManager import EntityManager
-from .ComponentManager import ComponentManager
+# import the world class definition
+from .World import World
 
-# create global manager instances
-_entityManager = EntityManager()
-_componentManager = ComponentManager()
\ No newline at end of file
+# the default world, used by entities and scenes that are created without
+# specifying a world, which is created when first used (so that importing
+# the package is quick, and the default world can be configured first)
+_defaultWorld = None
+
+# the keyword arguments used to create the default world
+_defaultWorldOptions = {}
+
+def getDefaultWorld():
+
+    '''
+    Gets the world used by entities and scenes that are created without specifying a world,
+    creating it the first time it is used.
+    :return ecs.World: Returns the default world.
+    '''
+
+    global _defaultWorld
+    if _defaultWorld is None:
+        _defaultWorld = World(**_defaultWorldOptions)
+    return _defaultWorld
+
+def configureDefaultWorld(**options):
+
+    '''
+    Sets the options used to create the default world (see ecs.World), e.g. configureDefaultWorld(capacity = 5000).
+    This must be called before any entities or scenes are created in the default world.
+    :param any options: The keyword arguments used to create the default world.
+    '''
+
+    if _defaultWorld is not None:
+        raise Exception('The default world has already been created.')
+    _defaultWorldOptions.update(options)
+
+def __getattr__(name):
+
+    '''
+    Gets the default world's managers, as _entityManager and _componentManager, creating the default world if required.
+    '''
+
+    if name == '_entityManager':
+        return getDefaultWorld().entityManager
+    if name == '_componentManager':
+        return getDefaultWorld().componentManager
+    raise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(name))
@@ -0,0 +1,137 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+from collections import deque
+
+class Profiler:
+
+    '''
+    Records how long each system in a scene takes, over a rolling window of frames.
+    Profiling is enabled by setting scene.profiler to a Profiler, and disabled by setting it to None.
+    For each system (keyed by its type name) the following are recorded each frame:
+     - 'update': the time taken by update() and the entity-level update methods
+     - 'updateEntities': the time taken by updateEntities() or updateEntity()
+     - 'draw': the time taken by draw() and the entity-level draw methods
+     - 'drawEntities': the time taken by drawEntities() or drawEntity()
+     - 'entities': the number of entities processed
+     - 'inactiveEntities': the number of entities not processed because they are inactive
+    The total time taken by Scene.update() and Scene.draw() is also recorded (keyed by 'scene').
+    All times are in seconds.
+    :param int frames: The number of recent frames to keep (default = 120).
+    '''
+
+    def __init__(self, frames = 120):
+
+        self.frames = frames
+
+        # a dictionary mapping names to dictionaries of
+        # values for each metric, for the most recent frames
+        self._samples = {}
+
+        # the inactive entities in the scene being updated,
+        # found once per frame (and only when profiling)
+        self._inactiveEntities = []
+
+    def record(self, name, metric, value):
+
+        '''
+        Records a value for the current frame.
+        :param str name: The name of the system (or 'scene').
+        :param str metric: The name of the metric, e.g. 'update'.
+        :param float value: The value to record.
+        '''
+
+        metrics = self._samples.get(name)
+        if metrics is None:
+            metrics = self._samples.setdefault(name, {})
+        samples = metrics.get(metric)
+        if samples is None:
+            samples = metrics.setdefault(metric, deque(maxlen = self.frames))
+        samples.append(value)
+
+    def getStats(self, percentiles = (50, 90, 99)):
+
+        '''
+        Gets statistics for each recorded metric, over the most recent frames.
+        :param tuple(int) percentiles: The percentiles to include (default = (50, 90, 99)).
+        :return dict: Returns a dictionary mapping names to dictionaries mapping
+        metrics to dictionaries of statistics, e.g. stats['PhysicsSystem']['update']['p90'].
+        '''
+
+        stats = {}
+        for name, metrics in list(self._samples.items()):
+            stats[name] = {}
+            for metric, samples in list(metrics.items()):
+                values = sorted(samples)
+                if len(values) == 0:
+                    continue
+                metricStats = {
+                    'frames': len(values),
+                    'mean': sum(values) / len(values),
+                    'min': values[0],
+                    'max': values[-1]
+                }
+                # nearest-rank percentiles
+                for percentile in percentiles:
+                    rank = max(1, -(-percentile * len(values) // 100))
+                    metricStats['p' + str(percentile)] = values[min(rank, len(values)) - 1]
+                stats[name][metric] = metricStats
+        return stats
+
+    def toJSON(self, percentiles = (50, 90, 99), indent = None):
+
+        '''
+        Gets the statistics from getStats() as JSON.
+        :param tuple(int) percentiles: The percentiles to include (default = (50, 90, 99)).
+        :param int indent: The JSON indent (default = None, for compact JSON).
+        :return str: Returns the statistics as a JSON string.
+        '''
+
+        import json
+        return json.dumps(self.getStats(percentiles), indent = indent)
+
+    def reset(self):
+
+        '''
+        Removes all recorded values.
+        '''
+
+        self._samples = {}
+
+    #
+    # recording scene and system timings (used by ecs.Scene)
+    #
+
+    def _beginUpdate(self, scene):
+
+        '''
+        Finds the inactive entities in a scene, before its systems are updated.
+        :param ecs.Scene scene: The scene being updated.
+        '''
+
+        self._inactiveEntities = [entity for entity in scene._entities if entity._active is False]
+
+    def _recordSystemUpdate(self, scene, system, updateTime, entityTime):
+
+        '''
+        Records the time taken to update a system, along with the number
+        of entities it processed, and the number skipped as inactive.
+        '''
+
+        name = type(system).__name__
+        query = scene._systemQueries[system]
+        self.record(name, 'update', updateTime)
+        self.record(name, 'updateEntities', entityTime)
+        self.record(name, 'entities', len(query))
+        self.record(name, 'inactiveEntities', sum(1 for entity in self._inactiveEntities if query._matchesIgnoringActive(entity)))
+
+    def _recordSystemDraw(self, system, drawTime, entityTime):
+
+        '''
+        Records the time taken to draw a system.
+        '''
+
+        name = type(system).__name__
+        self.record(name, 'draw', drawTime)
+        self.record(name, 'drawEntities', entityTime)
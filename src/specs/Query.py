@@ -0,0 +1,186 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+from .Globals import getDefaultWorld
+
+class Query:
+
+    '''
+    A cached collection of the active entities in a scene that have all of the specified
+    component types, none of the excluded component types and (if specified) at least one
+    of the any-of component types. Entities can also be matched by their tags.
+    Queries are created using Scene.query(), and are updated incrementally as entities,
+    components and tags change.
+    Iterating through a query yields (entity, component1, component2, ...) tuples,
+    with a component for each of the specified component types, in order.
+    :param list(type(ecs.Component)) componentTypes: The component types an entity must have.
+    :param list(type(ecs.Component)) exclude: The component types an entity must not have (default = none).
+    :param list(type(ecs.Component)) anyOf: The component types an entity must have at least one of (default = none).
+    :param list(str) tags: The tags an entity must have (default = none).
+    :param list(str) excludeTags: The tags an entity must not have (default = none).
+    :param ecs.ComponentManager componentManager: The component manager of the entities' world (default = None, for the default world's).
+    '''
+
+    def __init__(self, componentTypes, exclude = (), anyOf = (), tags = (), excludeTags = (), componentManager = None):
+
+        self.componentTypes = tuple(componentTypes)
+        self.excludedComponentTypes = tuple(exclude)
+        self.anyComponentTypes = tuple(anyOf)
+        self.tags = frozenset(tags)
+        self.excludedTags = frozenset(excludeTags)
+
+        # the component manager storing the entities' components
+        self._componentManager = componentManager if componentManager is not None else getDefaultWorld().componentManager
+
+        # tags are only checked (and queries only updated when tags change) if tags are used
+        self._usesTags = len(self.tags) > 0 or len(self.excludedTags) > 0
+
+        # bitmasks of the above component types, which are compared
+        # against entity signatures to quickly check for a match
+        # (unregistered component types are registered here, so that
+        # they have an ID, and therefore a bit, to check against)
+        self._requiredMask = 0
+        for componentType in self.componentTypes:
+            self._requiredMask |= self._componentManager.getComponentTypeMask(componentType)
+        self._excludedMask = 0
+        for componentType in self.excludedComponentTypes:
+            self._excludedMask |= self._componentManager.getComponentTypeMask(componentType)
+        self._anyMask = 0
+        for componentType in self.anyComponentTypes:
+            self._anyMask |= self._componentManager.getComponentTypeMask(componentType)
+
+        # the matched entities, in an insertion-ordered dict mapping
+        # each entity to a tuple of its components of the specified types
+        self._results = {}
+
+        # the change tick at which getChanged() last read the changes to each component type
+        self._changeTicks = {}
+
+    def __len__(self):
+
+        return len(self._results)
+
+    def __contains__(self, entity):
+
+        return entity in self._results
+
+    def __iter__(self):
+
+        '''
+        Iterates through the matched entities, in the order they were matched.
+        The results are copied first, so entities and components can be changed while iterating.
+        :return iter(tuple): Yields (entity, component1, component2, ...) tuples.
+        '''
+
+        return iter([(entity,) + components for entity, components in self._results.items()])
+
+    @property
+    def entities(self):
+
+        '''
+        The matched entities, in the order they were matched.
+        :return dict_keys(ecs.Entity): Returns a live view of the matched entities.
+        '''
+
+        return self._results.keys()
+
+    def getComponents(self, entity):
+
+        '''
+        Gets the components of the specified types for a matched entity.
+        :param ecs.Entity entity: The entity to get the components for.
+        :return tuple(ecs.Component): Returns the entity's components (or None if the entity isn't matched).
+        '''
+
+        return self._results.get(entity)
+
+    def getChanged(self, componentType, sinceTick = None):
+
+        '''
+        Gets the matched entities whose component of the specified type has changed after a tick
+        (see ComponentManager.trackChanges()), without checking the unchanged entities.
+        If no tick is given, the changes since the query last got the changes to the component type are returned
+        (which increases the change tick, so shouldn't be done by systems running concurrently,
+        which can use Scene.getChangedEntities() instead).
+        :param type(ecs.Component) componentType: The type of component to check.
+        :param int sinceTick: The change tick after which changes are included
+        (default = None, for the changes since this query last got them).
+        :return list(tuple): Returns (entity, component1, component2, ...) tuples, in the order the entities last changed.
+        '''
+
+        if sinceTick is None:
+            sinceTick = self._changeTicks.get(componentType, 0)
+            self._changeTicks[componentType] = self._componentManager.advanceChangeTick()
+
+        results = self._results
+        return [(entity,) + results[entity] for entity in self._componentManager.getChangedEntities(componentType, sinceTick) if entity in results]
+
+    def matchesEntity(self, entity):
+
+        '''
+        Checks whether an entity should be included in the query.
+        :param ecs.Entity entity: The entity to check.
+        :return bool: Returns True if the entity is active and matches the query's component types and tags.
+        '''
+
+        # inactive entities are never matched
+        return entity._active is True and self._matchesIgnoringActive(entity)
+
+    def _matchesIgnoringActive(self, entity):
+
+        '''
+        Checks whether an entity matches the query's component types and tags, whether or not it is active.
+        :param ecs.Entity entity: The entity to check.
+        :return bool: Returns True if the entity matches the query's component types and tags.
+        '''
+
+        # check the entity's tags
+        if self._usesTags and (self.tags.issubset(entity.tags) is False or self.excludedTags.isdisjoint(entity.tags) is False):
+            return False
+
+        # compare the entity's component signature against the query's masks
+        signature = entity.signature
+        return signature & self._requiredMask == self._requiredMask and \
+            signature & self._excludedMask == 0 and \
+            (self._anyMask == 0 or signature & self._anyMask != 0)
+
+    def _update(self, entity):
+
+        '''
+        Adds, updates or removes an entity whose components or active state have changed.
+        :param ecs.Entity entity: The entity that has changed.
+        '''
+
+        # the components are fetched again, as they may have been replaced
+        if self.matchesEntity(entity):
+            self._results[entity] = tuple(self._componentManager.getComponentForEntity(entity, t) for t in self.componentTypes)
+        else:
+            self._results.pop(entity, None)
+
+    def _updateMany(self, entities):
+
+        '''
+        Adds or updates many entities, only checking each
+        combination of signature, active state (and tags, if used) once.
+        :param list(ecs.Entity) entities: The entities that have changed.
+        '''
+
+        matches = {}
+        for entity in entities:
+            key = (entity.signature, entity._active, frozenset(entity.tags) if self._usesTags else None)
+            if key not in matches:
+                matches[key] = self.matchesEntity(entity)
+            if matches[key] is True:
+                self._results[entity] = tuple(self._componentManager.getComponentForEntity(entity, t) for t in self.componentTypes)
+            else:
+                self._results.pop(entity, None)
+
+    def _remove(self, entity):
+
+        '''
+        Removes an entity from the query.
+        :param ecs.Entity entity: The entity to remove.
+        '''
+
+        self._results.pop(entity, None)
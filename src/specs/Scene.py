@@ -2,29 +2,180 @@
 #  -- By Rik Cross
 #  -- MIT licenced, free to use, modify and distribute
 
+import sys
+import time
+
+from .System import System
+from .Entity import Entity
+from .Query import Query
+from .ShardPool import ShardPool
+from .CommandBuffer import CommandBuffer
+from .Globals import getDefaultWorld
+
+class _DefaultWorldScenes:
+
+    '''
+    Gets the scenes in the default world, when accessed as Scene.scenes.
+    '''
+
+    def __get__(self, instance, owner):
+
+        return getDefaultWorld().scenes
+
+def _compactDict(d):
+
+    '''
+    Frees the space left in a dictionary by removed items, keeping the same dictionary object
+    (so that views of it remain live) and the order of its items.
+    :param dict d: The dictionary to compact.
+    '''
+
+    items = list(d.items())
+    d.clear()
+    d.update(items)
+
+class _SystemSchedule:
+
+    '''
+    The state used to schedule a system's updates in a scene (when using an update interval or
+    update budget), kept by each scene, as a system can be added to more than one scene.
+    '''
+
+    def __init__(self):
+
+        # the time elapsed since the system last updated, and (when using an update budget)
+        # the total time the system has been updated for, the position of the next entity to
+        # update, and the total time at which each entity was last updated
+        self.timeSinceUpdate = 0
+        self.elapsedTime = 0
+        self.nextEntityIndex = 0
+        self.entityUpdateTimes = {}
+
 class Scene:
 
     '''
     A scene is a collection of entities and systems.
     Systems added to the scene will process all appropriate entities added to the scene.
+    :param ecs.World world: The world the scene belongs to (default = None, for the default world).
+    :param int capacity: The number of entity IDs to make room for in the world (default = None, to leave the world's capacity unchanged).
     '''
 
-    # a static list of all scenes
-    scenes = []
+    # the scenes in the default world, kept for compatibility
+    # (the scenes in other worlds are in world.scenes)
+    scenes = _DefaultWorldScenes()
 
-    def __init__(self):
+    def __init__(self, world = None, capacity = None):
 
-        # add this scene to the static list of all scenes
-        Scene.scenes.append(self)
+        # add this scene to its world's list of scenes
+        self.world = world if world is not None else getDefaultWorld()
+        self.world.scenes.append(self)
+
+        # make room for the scene's entities up front
+        if capacity is not None:
+            self.world.reserve(capacity)
 
         # initially the scene is empty
-        self.entities = []
+        # entities are stored in an insertion-ordered dict (used as a set),
+        # so that adding, removing and finding entities doesn't require a search
+        self._entities = {}
         self.systems = []
+
+        # cached queries, keyed by their component types, which
+        # are updated incrementally as entities and components change
+        self._queries = {}
+
+        # the keys of queries requested using query(), which are kept until released
+        self._requestedQueries = set()
+
+        # the query providing the entities for each system in the scene, along with its key,
+        # and the number of systems using each query (which are released once unused)
+        self._systemQueries = {}
+        self._systemQueryKeys = {}
+        self._systemQueryCounts = {}
+
+        # the change tick at which each system in the scene last updated
+        self._systemChangeTicks = {}
+
+        # the scheduling state of each system in the scene
+        self._systemSchedules = {}
+
+        # changes to entities recorded while systems are running,
+        # which are made after each system (or scheduler stage) has updated
+        self._commands = CommandBuffer(self)
+
+        # the command buffer used by each of an ecs.Scheduler's threads
+        # while running a system (created by the scheduler when first needed)
+        self._threadCommands = None
+
+        # an optional ecs.Scheduler, used to run systems concurrently
+        self.scheduler = None
+
+        # the ecs.ShardPool used to run systems with runInProcesses = True
+        # on worker processes (created when first needed)
+        self.shardPool = None
+
+        # how far (from 0 to 1) the scene is between the last update and the next one,
+        # which an ecs.FixedTimestepLoop sets before drawing, so that
+        # draw systems can interpolate between the previous and current state
+        self.interpolation = 1.0
+
+        # an optional ecs.Profiler, which records how long each system takes
+        self.profiler = None
+
+        # an index of the entities in the scene with each tag, mapping
+        # tags to insertion-ordered dicts (used as sets) of entities
+        self._tagIndex = {}
     
+    @property
+    def commands(self):
+
+        '''
+        The scene's command buffer, for recording changes to make once systems have finished updating.
+        Systems running concurrently using an ecs.Scheduler each get their own command buffer.
+        :return ecs.CommandBuffer: Returns the command buffer.
+        '''
+
+        threadCommands = self._threadCommands
+        if threadCommands is not None:
+            buffer = getattr(threadCommands, 'buffer', None)
+            if buffer is not None:
+                return buffer
+        return self._commands
+
     #
     # entities
     #
 
+    @property
+    def entities(self):
+
+        '''
+        The entities in the scene, in the order they were added.
+        A copy is returned, so that entities can be added to and removed from the scene while iterating.
+        Use hasEntity() (or entity in scene) and len(scene) to check the entities without copying them.
+        :return list(ecs.Entity): Returns a list of the scene's entities.
+        '''
+
+        return list(self._entities)
+
+    def hasEntity(self, entity):
+
+        '''
+        Checks whether an entity is in the scene, without searching.
+        :param ecs.Entity entity: The entity to check.
+        :return bool: Returns True if the entity is in the scene.
+        '''
+
+        return entity in self._entities
+
+    def __contains__(self, entity):
+
+        return entity in self._entities
+
+    def __len__(self):
+
+        return len(self._entities)
+
     def addEntity(self, entity):
 
         '''
@@ -32,16 +183,77 @@ class Scene:
         :param ecs.Entity entity: The entity to add.
         '''
 
+        self._checkWorld(entity)
+
         # an entity should only appear in a scene once
-        if entity not in self.entities:
+        if entity not in self._entities:
 
             # add the entity to the scene
-            self.entities.append(entity)
+            self._entities[entity] = None
+            entity._scenes[self] = None
+            self._indexTags(entity, entity.tags)
+
+            # add the entity to each matching query
+            self._onEntityChanged(entity)
 
             # call the scene's onAddedToScene() method
             # for the added entity
             self.onEntityAddedToScene(entity)
         
+    def addEntities(self, entities):
+
+        '''
+        Adds many entities to the scene at once.
+        :param list(ecs.Entity) entities: The entities to add.
+        '''
+
+        # add the entities that aren't already in the scene
+        addedEntities = []
+        for entity in entities:
+            self._checkWorld(entity)
+            if entity not in self._entities:
+                self._entities[entity] = None
+                entity._scenes[self] = None
+                if len(entity.tags) > 0:
+                    self._indexTags(entity, entity.tags)
+                addedEntities.append(entity)
+
+        # add the entities to each matching query, one query at a time
+        for query in self._queries.values():
+            query._updateMany(addedEntities)
+
+        # call the scene's onAddedToScene() method for each
+        # added entity, if it has been overridden
+        if type(self).onEntityAddedToScene is not Scene.onEntityAddedToScene:
+            for entity in addedEntities:
+                self.onEntityAddedToScene(entity)
+
+    def spawn(self, count, *componentSources):
+
+        '''
+        Creates many entities at once and adds them to the scene.
+        Each component source provides one component type for all of the entities, either as
+        a list of components (one per entity), or a function that takes the index of an entity
+        (from 0 to count - 1) and returns its component.
+        :param int count: The number of entities to create.
+        :param list(list(ecs.Component) or function) componentSources: The components to add to the entities.
+        :return list(ecs.Entity): Returns the created entities.
+        '''
+
+        entities = Entity.createMany(count, *componentSources, world = self.world)
+        self.addEntities(entities)
+        return entities
+
+    def _checkWorld(self, entity):
+
+        '''
+        Raises an exception if an entity belongs to a different world to the scene.
+        :param ecs.Entity entity: The entity to check.
+        '''
+
+        if entity.world is not self.world:
+            raise Exception('Entity ' + str(entity.ID) + ' belongs to a different world.')
+
     def removeEntity(self, entity):
 
         '''
@@ -50,14 +262,209 @@ class Scene:
         '''
         
         # only attempt to remove entities that exist in the scene
-        if entity in self.entities:
+        if entity in self._entities:
         
             # remove the entity
-            self.entities.remove(entity)
+            self._detachEntity(entity)
         
             # call the scene's onRemovedFromScene() method
             # for the removed entity
             self.onEntityRemovedFromScene(entity)
+
+    def compact(self):
+
+        '''
+        Frees the space left in the scene's entities, queries and tag index by removed entities.
+        Called by World.compact().
+        '''
+
+        _compactDict(self._entities)
+        for query in self._queries.values():
+            _compactDict(query._results)
+        for taggedEntities in self._tagIndex.values():
+            _compactDict(taggedEntities)
+
+    def getMemoryUsage(self):
+
+        '''
+        Estimates the memory used by the scene to store its entities, queries and tag index
+        (but not the entities and components themselves, which are included by World.getMemoryUsage()).
+        :return int: Returns the estimated number of bytes.
+        '''
+
+        size = sys.getsizeof(self._entities) + sys.getsizeof(self._tagIndex)
+        for query in self._queries.values():
+            size += sys.getsizeof(query._results) + sum(sys.getsizeof(components) for components in query._results.values())
+        for taggedEntities in self._tagIndex.values():
+            size += sys.getsizeof(taggedEntities)
+        return size
+
+    def _detachEntity(self, entity):
+
+        '''
+        Removes an entity from the scene and from all queries,
+        without running the onEntityRemovedFromScene() callback.
+        :param ecs.Entity entity: The entity to remove.
+        '''
+
+        del self._entities[entity]
+        del entity._scenes[self]
+        self._unindexTags(entity, entity.tags)
+        for query in self._queries.values():
+            query._remove(entity)
+
+    def _onEntityChanged(self, entity):
+
+        '''
+        Updates the queries for an entity whose
+        components or active state have changed.
+        :param ecs.Entity entity: The entity that has changed.
+        '''
+
+        for query in self._queries.values():
+            query._update(entity)
+
+    def _onEntitiesChanged(self, entities):
+
+        '''
+        Updates the queries for many entities whose components have changed.
+        :param list(ecs.Entity) entities: The entities that have changed.
+        '''
+
+        for query in self._queries.values():
+            query._updateMany(entities)
+
+    #
+    # tags
+    #
+
+    def getEntitiesWithTag(self, tag, *moreTags):
+
+        '''
+        Gets the entities in the scene with one or more tags, using the scene's tag index.
+        :param str tag: The tag to find.
+        :param list(str) moreTags: Additional optional tags that entities must also have.
+        :return list(ecs.Entity): Returns the entities with all of the tags, in the order they were tagged.
+        '''
+
+        # start with the smallest set of tagged entities
+        taggedEntities = [self._tagIndex.get(t, {}) for t in (tag,) + moreTags]
+        taggedEntities.sort(key = len)
+        return [entity for entity in taggedEntities[0] if all(entity in t for t in taggedEntities[1:])]
+
+    def _indexTags(self, entity, tags):
+
+        '''
+        Adds an entity to the tag index for the specified tags.
+        :param ecs.Entity entity: The entity to index.
+        :param list(str) tags: The tags to index the entity under.
+        '''
+
+        for tag in tags:
+            if tag not in self._tagIndex:
+                self._tagIndex[tag] = {}
+            self._tagIndex[tag][entity] = None
+
+    def _unindexTags(self, entity, tags):
+
+        '''
+        Removes an entity from the tag index for the specified tags.
+        :param ecs.Entity entity: The entity to remove.
+        :param list(str) tags: The tags to remove the entity from.
+        '''
+
+        for tag in tags:
+            taggedEntities = self._tagIndex.get(tag)
+            if taggedEntities is not None:
+                taggedEntities.pop(entity, None)
+                if len(taggedEntities) == 0:
+                    del self._tagIndex[tag]
+
+    def _onEntityTagsChanged(self, entity, addedTags, removedTags):
+
+        '''
+        Updates the tag index and queries for an entity whose tags have changed.
+        :param ecs.Entity entity: The entity that has changed.
+        :param list(str) addedTags: The tags added to the entity.
+        :param list(str) removedTags: The tags removed from the entity.
+        '''
+
+        self._indexTags(entity, addedTags)
+        self._unindexTags(entity, removedTags)
+
+        # only queries using tags need to be updated
+        for query in self._queries.values():
+            if query._usesTags:
+                query._update(entity)
+
+    #
+    # queries
+    #
+
+    def query(self, *componentTypes, exclude = (), anyOf = (), tags = (), excludeTags = ()):
+
+        '''
+        Gets a query for the active entities in the scene with all of the specified component types.
+        Queries are cached, so getting the same query again is fast, and
+        the results are kept up-to-date as entities and components change.
+        Iterating through the query yields (entity, component1, component2, ...) tuples.
+        :param list(type(ecs.Component)) componentTypes: The component types an entity must have.
+        :param list(type(ecs.Component)) exclude: The component types an entity must not have (default = none).
+        :param list(type(ecs.Component)) anyOf: The component types an entity must have at least one of (default = none).
+        :param list(str) tags: The tags an entity must have (default = none).
+        :param list(str) excludeTags: The tags an entity must not have (default = none).
+        :return ecs.Query: Returns the query.
+        '''
+
+        # the query is kept up-to-date until released
+        key = (tuple(componentTypes), frozenset(exclude), frozenset(anyOf), frozenset(tags), frozenset(excludeTags))
+        self._requestedQueries.add(key)
+        return self._getQuery(key)
+
+    def releaseQuery(self, query):
+
+        '''
+        Stops keeping a query returned by query() up-to-date, once it is no longer used by any of the scene's systems.
+        The query should no longer be used, and calling query() again returns a new query.
+        :param ecs.Query query: The query to release.
+        '''
+
+        for key, cachedQuery in self._queries.items():
+            if cachedQuery is query:
+                self._requestedQueries.discard(key)
+                self._releaseQueryIfUnused(key)
+                return
+
+    def _getQuery(self, key):
+
+        '''
+        Gets a cached query, creating it if required.
+        :param tuple key: The query's (component types, excluded component types, any-of component types, tags, excluded tags).
+        :return ecs.Query: Returns the query.
+        '''
+
+        # return the cached query, if one exists
+        query = self._queries.get(key)
+        if query is None:
+
+            # or create a new query and find the entities that match it
+            query = Query(*key, componentManager = self.world.componentManager)
+            query._updateMany(self._entities)
+            self._queries[key] = query
+
+        return query
+
+    def _releaseQueryIfUnused(self, key):
+
+        '''
+        Removes a cached query if it hasn't been requested using query() and no systems use it,
+        so that it is no longer updated as entities and components change.
+        :param tuple key: The query's key.
+        '''
+
+        if key not in self._requestedQueries and self._systemQueryCounts.get(key, 0) == 0:
+            self._queries.pop(key, None)
+            self._systemQueryCounts.pop(key, None)
     
     #
     # systems
@@ -77,6 +484,11 @@ class Scene:
 
         # add the system
         self.systems.append(system)
+        system._scenes.append(self)
+        self._systemSchedules[system] = _SystemSchedule()
+
+        # find the entities that the system should process
+        self._onSystemChanged(system)
 
     def removeSystem(self, system):
 
@@ -86,8 +498,78 @@ class Scene:
         '''
 
         # remove the system if it exists in the scene
-        if system not in self.systems:
+        if system in self.systems:
             self.systems.remove(system)
+            system._scenes.remove(self)
+            del self._systemQueries[system]
+            self._systemChangeTicks.pop(system, None)
+            del self._systemSchedules[system]
+
+            # release the system's query if no longer used
+            key = self._systemQueryKeys.pop(system)
+            self._systemQueryCounts[key] -= 1
+            self._releaseQueryIfUnused(key)
+
+    def _onSystemChanged(self, system):
+
+        '''
+        Gets the query for a system whose requirements have changed.
+        :param ecs.System system: The system that has changed.
+        '''
+
+        key = (tuple(system.requiredComponentTypeList), frozenset(system.excludedComponentTypeList), frozenset(system.anyComponentTypeList),
+            frozenset(system.requiredTagList), frozenset(system.excludedTagList))
+        oldKey = self._systemQueryKeys.get(system)
+        if key != oldKey:
+
+            # use the query for the new requirements
+            self._systemQueryCounts[key] = self._systemQueryCounts.get(key, 0) + 1
+            self._systemQueries[system] = self._getQuery(key)
+            self._systemQueryKeys[system] = key
+
+            # and release the query for the old requirements if no longer used
+            if oldKey is not None:
+                self._systemQueryCounts[oldKey] -= 1
+                self._releaseQueryIfUnused(oldKey)
+
+        # start tracking changes to the system's changed component types
+        if len(system.changedComponentTypeList) > 0:
+            self.world.componentManager.trackChanges(*system.changedComponentTypeList)
+
+    def getEntitiesForSystem(self, system):
+
+        '''
+        Gets the entities in the scene that a system processes.
+        :param ecs.System system: The system to get the entities for.
+        :return list(ecs.Entity): Returns the active entities that have all of the system's required components.
+        '''
+
+        return list(self._systemQueries[system].entities) if system in self._systemQueries else []
+
+    def getChangedEntities(self, system, componentType, *otherComponentTypes):
+
+        '''
+        Gets the entities in the scene that a system processes, with a component of one of the specified types
+        that has changed since the system last updated (see ComponentManager.trackChanges()).
+        Only the changed entities are checked, so this is fast when few components change.
+        :param ecs.System system: The system to get the entities for.
+        :param type(ecs.Component) componentType: The changed component type.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional changed component types.
+        :return list(ecs.Entity): Returns the changed entities, in the order they last changed.
+        '''
+
+        query = self._systemQueries.get(system)
+        if query is None:
+            return []
+
+        # find the changes for each type, without repeating entities
+        sinceTick = self._systemChangeTicks.get(system, 0)
+        changed = {}
+        for componentType in [componentType] + list(otherComponentTypes):
+            for entity in self.world.componentManager.getChangedEntities(componentType, sinceTick):
+                if entity in query._results:
+                    changed[entity] = None
+        return list(changed)
 
     #
     # scene game loop methods
@@ -97,86 +579,264 @@ class Scene:
 
         '''
         Update method is called once per frame, and runs the
-        update() and updateEntity() method for all systems.
-        This method also deletes entities marked for deletion.
+        update() and updateEntities() or updateEntity() methods for all systems.
+        The scene's command buffer is flushed after each system has updated.
+        This method also destroys entities marked for deletion.
         :param float deltaTime: The elapsed time (default = 1).
         '''
 
-        # run each system in the scene
-        for system in self.systems:
+        profiler = self.profiler
+        if profiler is not None:
+            startTime = time.perf_counter()
+            profiler._beginUpdate(self)
+
+        # run each system in the scene, using the scheduler if there is one
+        if self.scheduler is not None:
+            self.scheduler.run(self, deltaTime = deltaTime)
+        else:
+            for system in self.systems:
+                self._runSystemUpdate(system, deltaTime = deltaTime)
+                self.commands.flush()
+
+        #
+        # clean-up
+        #
+
+        # make any changes recorded outside of systems, and destroy
+        # all entities marked for deletion, once all systems have run
+        self.commands.flush()
+        self.world.entityManager.destroyQueuedEntities()
+
+        if profiler is not None:
+            profiler.record('scene', 'update', time.perf_counter() - startTime)
 
-            # call the main system update() method once per frame
-            system.update(self, deltaTime=1)
-            
-            # call the scene updateEntity() method once per frame
-            # on each entity that has all of the required component types
-            for entity in self.entities:
-
-                # check if the entity has all required components
-                entityHasAllRequiredComponents = True
-                for requiredComponentType in system.requiredComponentTypeList:
-                    if entity.getComponent(requiredComponentType) is None:
-                        entityHasAllRequiredComponents = False
-                        break
-                
-                # process all active entities with the required components
-                if entityHasAllRequiredComponents is True and entity.active is True:
-                    system.updateEntity(self, entity, deltaTime = 1)
-
-            #
-            # clean-up
-            #
-
-            # delete all entities in the scene that are marked for deletion
-            # looping backwards through the list to avoid skipping entities
-            for i in range(len(self.entities) - 1, -1, -1):
-                if self.entities[i]._markedForDeletion == True:
-                    entityToDelete = self.entities[i]
-                    # remove all components
-                    entityToDelete.removeAllComponents()
-                    # delete the entity from all scenes
-                    for scene in Scene.scenes:
-                        scene.entities.remove(entityToDelete)
-                    # TODO - is this needed?
-                    del entityToDelete
-                    
     def draw(self, surface = None):
 
         '''
         Draw method is called once per frame, and runs the
-        draw() and drawEntity() for all systems.
+        draw() and drawEntities() or drawEntity() methods for all systems.
         :param any surface: The (optional) surface to draw to.
         This can be any type of surface, depending on what is used in the systems (default = None).
         '''
         
+        profiler = self.profiler
+        if profiler is not None:
+            startTime = time.perf_counter()
+
         # run each system in the scene
         for system in self.systems:
 
+            if profiler is not None:
+                systemStartTime = time.perf_counter()
+
             # call the main system draw() method once per frame
             # for those systems drawing below entities
             if system.drawAfterEntities is False:
                 system.draw(self, surface)
             
-            # call the scene drawEntity() method once per frame
-            # on each entity that has all of the required component types
-            for entity in self.entities:
-                entityHasAllRequiredComponents = True
-
-                # check if the entity has all required components
-                for requiredComponentType in system.requiredComponentTypeList:
-                    if entity.getComponent(requiredComponentType) is None:
-                        entityHasAllRequiredComponents = False
-                        break
-                
-                # process all active entities with the required components
-                if entityHasAllRequiredComponents is True and entity.active is True:
-                    system.drawEntity(self, entity, surface)
+            # call the system's drawEntities() method, or drawEntity() method
+            # for each active entity that has all of the required component types
+            if profiler is not None:
+                entityStartTime = time.perf_counter()
+                self._drawSystemEntities(system, surface)
+                entityTime = time.perf_counter() - entityStartTime
+            else:
+                self._drawSystemEntities(system, surface)
 
             # call the main system draw() method once per frame
             # for those systems drawing above entities
             if system.drawAfterEntities is True:
                 system.draw(self, surface)
 
+            if profiler is not None:
+                profiler._recordSystemDraw(system, time.perf_counter() - systemStartTime, entityTime)
+
+        if profiler is not None:
+            profiler.record('scene', 'draw', time.perf_counter() - startTime)
+
+    def _runSystemUpdate(self, system, deltaTime = 1, changeTick = None):
+
+        '''
+        Runs a system's update methods for one frame.
+        :param ecs.System system: The system to run.
+        :param float deltaTime: The elapsed time (default = 1).
+        :param int changeTick: The change tick to run the system at, already set by an ecs.Scheduler running systems
+        concurrently (default = None, to increase the change tick before and after running the system).
+        '''
+
+        # systems with an update interval only update once enough time has
+        # passed, and are passed all of the time elapsed since they last updated
+        if system.updateInterval > 0:
+            schedule = self._systemSchedules[system]
+            schedule.timeSinceUpdate += deltaTime
+            if schedule.timeSinceUpdate < system.updateInterval:
+                return
+            deltaTime = schedule.timeSinceUpdate
+            schedule.timeSinceUpdate = 0
+
+        # the change tick is increased before and after the system updates, so that the system
+        # finds changes made since it last updated, but not changes made while updating
+        # (systems running concurrently share a change tick, which the scheduler increases)
+        ownsChangeTick = changeTick is None
+        if ownsChangeTick:
+            self.world.componentManager._changeTick += 1
+            changeTick = self.world.componentManager._changeTick
+
+        # time the system, if profiling
+        profiler = self.profiler
+        if profiler is not None:
+            startTime = time.perf_counter()
+
+        # call the main system update() method once per frame
+        system.update(self, deltaTime = deltaTime)
+
+        # call the system's updateEntities() method, or updateEntity() method
+        # for each active entity that has all of the required component types
+        if profiler is not None:
+            entityStartTime = time.perf_counter()
+            self._updateSystemEntities(system, deltaTime = deltaTime)
+            endTime = time.perf_counter()
+            profiler._recordSystemUpdate(self, system, endTime - startTime, endTime - entityStartTime)
+        else:
+            self._updateSystemEntities(system, deltaTime = deltaTime)
+
+        self._systemChangeTicks[system] = changeTick
+        if ownsChangeTick:
+            self.world.componentManager._changeTick += 1
+
+    def _updateSystemEntities(self, system, deltaTime = 1):
+
+        '''
+        Runs a system's entity-level update method for the entities it processes.
+        If the system overrides updateEntities(), it is called once with all
+        entities, otherwise updateEntity() is called for each entity (if overridden).
+        :param ecs.System system: The system to run.
+        :param float deltaTime: The elapsed time (default = 1).
+        '''
+
+        matchedEntities = self._systemQueries[system]._results
+        systemType = type(system)
+
+        # only pass entities whose components have changed, if the system has specified changed component types
+        changedOnly = len(system.changedComponentTypeList) > 0
+        entities = self.getChangedEntities(system, *system.changedComponentTypeList) if changedOnly else list(matchedEntities)
+
+        # run the system on worker processes, if it has opted in
+        if system.runInProcesses is True:
+            if self.shardPool is None:
+                self.shardPool = ShardPool()
+            self.shardPool.run(self, system, deltaTime = deltaTime)
+
+        # pass all entities at once
+        elif systemType.updateEntities is not System.updateEntities:
+            if system.passComponents is True:
+                system.updateEntities(self, [(entity,) + matchedEntities[entity] for entity in entities], deltaTime = deltaTime)
+            else:
+                system.updateEntities(self, entities, deltaTime = deltaTime)
+
+        # or pass as many entities as the system's time budget allows
+        elif systemType.updateEntity is not System.updateEntity and system.updateBudget is not None and changedOnly is False:
+            self._updateSystemEntitiesWithBudget(system, deltaTime = deltaTime)
+
+        # or pass each entity in turn
+        elif systemType.updateEntity is not System.updateEntity:
+            for entity in entities:
+
+                # skip entities no longer matched by the system
+                # as a result of processing an earlier entity
+                components = matchedEntities.get(entity)
+                if components is not None:
+
+                    # pass the query's cached components, if the system has opted in
+                    if system.passComponents is True:
+                        system.updateEntity(self, entity, *components, deltaTime = deltaTime)
+                    else:
+                        system.updateEntity(self, entity, deltaTime = deltaTime)
+
+    def _updateSystemEntitiesWithBudget(self, system, deltaTime = 1):
+
+        '''
+        Runs a system's updateEntity() method for the entities it processes, until the system's
+        update budget is used up, continuing from where the previous frame stopped.
+        Each entity is passed the time elapsed since it was last updated.
+        At least one entity is updated each frame.
+        :param ecs.System system: The system to run.
+        :param float deltaTime: The elapsed time (default = 1).
+        '''
+
+        matchedEntities = self._systemQueries[system]._results
+        entities = list(matchedEntities)
+        count = len(entities)
+        if count == 0:
+            return
+
+        schedule = self._systemSchedules[system]
+        schedule.elapsedTime += deltaTime
+        elapsedTime = schedule.elapsedTime
+        updateTimes = schedule.entityUpdateTimes
+        endTime = time.perf_counter() + system.updateBudget
+
+        # start at the entity after the last one updated
+        start = schedule.nextEntityIndex % count
+        processed = 0
+        while processed < count:
+            entity = entities[(start + processed) % count]
+            processed += 1
+
+            # skip entities no longer matched by the system
+            # as a result of processing an earlier entity
+            components = matchedEntities.get(entity)
+            if components is not None:
+
+                # newly matched entities are passed this frame's elapsed time
+                entityDeltaTime = elapsedTime - updateTimes.get(entity, elapsedTime - deltaTime)
+                updateTimes[entity] = elapsedTime
+
+                if system.passComponents is True:
+                    system.updateEntity(self, entity, *components, deltaTime = entityDeltaTime)
+                else:
+                    system.updateEntity(self, entity, deltaTime = entityDeltaTime)
+
+            # stop once the budget is used up
+            if time.perf_counter() >= endTime:
+                break
+
+        schedule.nextEntityIndex = (start + processed) % count
+
+        # forget entities no longer processed, after each complete pass through the entities
+        if start + processed >= count and len(updateTimes) > len(matchedEntities):
+            schedule.entityUpdateTimes = {e: t for e, t in updateTimes.items() if e in matchedEntities}
+
+    def _drawSystemEntities(self, system, surface = None):
+
+        '''
+        Runs a system's entity-level draw method for the entities it processes.
+        If the system overrides drawEntities(), it is called once with all
+        entities, otherwise drawEntity() is called for each entity (if overridden).
+        :param ecs.System system: The system to run.
+        :param any surface: The surface to draw to (default = None).
+        '''
+
+        matchedEntities = self._systemQueries[system]._results
+        systemType = type(system)
+
+        # pass all entities at once
+        if systemType.drawEntities is not System.drawEntities:
+            if system.passComponents is True:
+                system.drawEntities(self, [(entity,) + components for entity, components in matchedEntities.items()], surface = surface)
+            else:
+                system.drawEntities(self, list(matchedEntities), surface = surface)
+
+        # or pass each entity in turn
+        elif systemType.drawEntity is not System.drawEntity:
+            for entity in list(matchedEntities):
+                components = matchedEntities.get(entity)
+                if components is not None:
+                    if system.passComponents is True:
+                        system.drawEntity(self, entity, *components, surface = surface)
+                    else:
+                        system.drawEntity(self, entity, surface)
+
     #
     # user-defined methods to override
     #
@@ -197,4 +857,4 @@ class Scene:
         :param ecs.Entity entity: The entity removed.
         '''
         
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,148 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+from .CommandBuffer import CommandBuffer
+
+class Scheduler:
+
+    '''
+    Runs the systems in a scene concurrently, using a thread pool.
+    Systems declare the component types they read and write (see System.addReadComponentType()
+    and System.addWriteComponentType()), and two systems conflict if either writes a component
+    type that the other reads or writes. Systems are grouped into stages, where each system runs in
+    a later stage than all earlier-added systems that it conflicts with, so that conflicting systems
+    always run in the order they were added, and results are deterministic. Systems in the same stage
+    run at the same time. Systems that don't declare any access conflict with all other systems.
+    Systems running concurrently should not add or remove components or entities directly,
+    but can record these changes using the scene's command buffer (scene.commands). Each system in a stage
+    records into its own buffer, and the buffers are flushed after the stage in the order the systems were added,
+    so spawned entities are given the same IDs whichever thread runs first.
+    This is most useful for systems that spend their time in code that releases the GIL
+    (such as NumPy), or on free-threaded Python builds.
+    :param int maxWorkers: The maximum number of threads (default = None, for the ThreadPoolExecutor default).
+    '''
+
+    def __init__(self, maxWorkers = None):
+
+        self.maxWorkers = maxWorkers
+
+        # the thread pool is created when first needed
+        self._executor = None
+
+    def conflicts(self, system, otherSystem):
+
+        '''
+        Checks whether two systems can't run at the same time.
+        :param ecs.System system: The first system.
+        :param ecs.System otherSystem: The second system.
+        :return bool: Returns True if either system writes a component type the other accesses.
+        '''
+
+        # systems that don't declare their access could access anything
+        if system._declaresAccess() is False or otherSystem._declaresAccess() is False:
+            return True
+
+        writes = set(system.writeComponentTypeList)
+        otherWrites = set(otherSystem.writeComponentTypeList)
+        return len(writes & (otherWrites | set(otherSystem.readComponentTypeList))) > 0 or \
+            len(otherWrites & set(system.readComponentTypeList)) > 0
+
+    def getStages(self, systems):
+
+        '''
+        Groups systems into stages that can each be run concurrently.
+        :param list(ecs.System) systems: The systems, in the order they were added.
+        :return list(list(ecs.System)): Returns the stages, in the order they should be run.
+        '''
+
+        # each system runs in the stage after the latest conflicting earlier system
+        stages = []
+        systemStages = []
+        for i, system in enumerate(systems):
+            stage = 0
+            for j in range(i):
+                if systemStages[j] >= stage and self.conflicts(system, systems[j]):
+                    stage = systemStages[j] + 1
+            systemStages.append(stage)
+            if stage == len(stages):
+                stages.append([])
+            stages[stage].append(system)
+
+        return stages
+
+    def run(self, scene, deltaTime = 1):
+
+        '''
+        Runs the update() and entity-level update methods of all systems in a scene.
+        :param ecs.Scene scene: The scene to update.
+        :param float deltaTime: The elapsed time (default = 1).
+        '''
+
+        # the stages are worked out each frame, which is cheap for
+        # the number of systems in a scene, and means that
+        # changes to systems and their access are always used
+        for stage in self.getStages(scene.systems):
+
+            # a system on its own is run on the calling thread
+            if len(stage) == 1:
+                scene._runSystemUpdate(stage[0], deltaTime)
+                scene.commands.flush()
+                continue
+
+            # otherwise run all systems in the stage, and wait for them to finish
+            # (getting each result raises any exception from the system)
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers = self.maxWorkers)
+            if scene._threadCommands is None:
+                import threading
+                scene._threadCommands = threading.local()
+            buffers = [CommandBuffer(scene) for _ in stage]
+
+            # the change tick is only changed on this thread, increased once before and once after the stage,
+            # so that the systems in the stage don't see each other's changes until they next update
+            componentManager = scene.world.componentManager
+            componentManager._changeTick += 1
+            changeTick = componentManager._changeTick
+            try:
+                futures = [self._executor.submit(Scheduler._runSystem, scene, system, deltaTime, buffer, changeTick)
+                    for system, buffer in zip(stage, buffers)]
+                for future in futures:
+                    future.result()
+            finally:
+                componentManager._changeTick += 1
+
+            # make each system's changes, in the order the systems were added
+            for buffer in buffers:
+                buffer.flush()
+            scene.commands.flush()
+
+    @staticmethod
+    def _runSystem(scene, system, deltaTime, buffer, changeTick):
+
+        '''
+        Runs a system's update methods on a thread in the pool, with scene.commands
+        on that thread being the system's own command buffer.
+        :param ecs.Scene scene: The scene being updated.
+        :param ecs.System system: The system to run.
+        :param float deltaTime: The elapsed time.
+        :param ecs.CommandBuffer buffer: The command buffer for the system to record its changes in.
+        :param int changeTick: The change tick shared by the systems in the stage.
+        '''
+
+        scene._threadCommands.buffer = buffer
+        try:
+            scene._runSystemUpdate(system, deltaTime, changeTick)
+        finally:
+            scene._threadCommands.buffer = None
+
+    def shutdown(self):
+
+        '''
+        Stops the scheduler's threads.
+        '''
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,228 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+import os
+import types
+
+from .ArrayComponent import ArrayComponent
+from .ArraySystem import ArraySystem
+from .ArrayView import ArrayView
+from .System import System
+
+class ShardPool:
+
+    '''
+    Runs systems on worker processes, by splitting the entities a system processes
+    into chunks (shards) and processing each chunk on a different process.
+    Systems opt in by setting runInProcesses = True, and all of their required component types
+    must be ArrayComponent types. Component data is moved into shared memory the first time it is
+    used, and is updated in place by the worker processes, so components aren't copied each frame.
+    The system (without its scenes) is sent to the workers each frame, along with a copy of the scene's
+    public attributes (e.g. scene.size), so both must be picklable. Worker processes can only access the
+    required components of the entities being processed, using entity.getComponent() or passComponents.
+    Requires NumPy and Python 3.8+.
+    :param int workers: The number of worker processes (default = None, for the number of CPUs).
+    '''
+
+    def __init__(self, workers = None):
+
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+
+        # the process pool is created when first needed
+        self._executor = None
+
+    def run(self, scene, system, deltaTime = 1):
+
+        '''
+        Runs a system's entity-level update methods for the entities it processes in a scene,
+        using the worker processes, and waits for them to finish.
+        :param ecs.Scene scene: The scene running the system.
+        :param ecs.System system: The system to run.
+        :param float deltaTime: The elapsed time (default = 1).
+        '''
+
+        # only array components can be accessed by worker processes
+        componentTypes = list(system.requiredComponentTypeList)
+        if len(componentTypes) == 0 or not all(issubclass(t, ArrayComponent) for t in componentTypes):
+            raise Exception('Systems run in processes must only require ArrayComponent types.')
+
+        # nothing to do if no entities are matched
+        entities = scene._systemQueries[system].entities
+        if len(entities) == 0:
+            return
+
+        # make sure the component data is in shared memory
+        storages = [scene.world.componentManager.getComponentStorage(t) for t in componentTypes]
+        for storage in storages:
+            storage.share()
+        storageInfo = [(id(storage), storage.getSharedMemoryInfo()) for storage in storages]
+
+        # get the positions of the entities in each storage
+        slots = ArrayView.getSlots(entities, storages)
+
+        # the public attributes of the scene, without its systems (or other objects used by the scene)
+        sceneState = {k: v for k, v in vars(scene).items() if not k.startswith('_') and k not in ('systems', 'scheduler', 'shardPool', 'profiler', 'world')}
+
+        # split the entities into a chunk for each worker
+        count = len(entities)
+        chunkCount = min(self.workers, count)
+        bounds = [count * i // chunkCount for i in range(chunkCount + 1)]
+
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers = self.workers)
+
+        # process each chunk, sending ranges rather than positions where possible,
+        # and wait for all chunks to finish (getting each result raises any exception)
+        futures = []
+        for start, stop in zip(bounds, bounds[1:]):
+            chunkSlots = [(start, stop) if s is None else s[start:stop] for s in slots]
+            futures.append(self._executor.submit(_runShard, system, sceneState, componentTypes, storageInfo, chunkSlots, deltaTime))
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+
+        '''
+        Stops the worker processes.
+        '''
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+#
+# worker process
+#
+
+# the shared memory attached to by a worker process, keyed by (storage ID, array key)
+_attachedArrays = {}
+
+class _AttachedStorage:
+
+    '''
+    The arrays of an ecs.ArrayStorage, attached to in a worker process.
+    Provides the parts of the ArrayStorage interface used by ecs.ArrayView and bound ecs.ArrayComponent objects.
+    '''
+
+    def __init__(self, storageID, sharedMemoryInfo):
+
+        self.arrays = {key: _attachArray(storageID, key, info) for key, info in sharedMemoryInfo.items()}
+        self.entityIDArray = self.arrays.pop('entityIDArray')
+
+        # maps entity IDs to positions, for the entities being processed
+        self._sparse = {}
+
+def _attachArray(storageID, key, info):
+
+    '''
+    Gets an array in shared memory, attaching to the shared memory if required.
+    :param int storageID: The ID of the storage in the main process.
+    :param str key: The key of the array in the storage.
+    :param tuple info: The (shared memory name, dtype, shape) of the array.
+    :return numpy.ndarray: Returns the array.
+    '''
+
+    import numpy
+    from multiprocessing import shared_memory
+
+    name, dtype, shape = info
+    attached = _attachedArrays.get((storageID, key))
+
+    # attach to the shared memory if not attached, or if the array has grown
+    if attached is None or attached[0] != name:
+        if attached is not None:
+            attached[1].close()
+        sharedMemory = shared_memory.SharedMemory(name = name)
+        attached = (name, sharedMemory)
+        _attachedArrays[(storageID, key)] = attached
+
+    return numpy.ndarray(shape, numpy.dtype(dtype), buffer = attached[1].buf)
+
+class _ShardEntity:
+
+    '''
+    An entity being processed in a worker process,
+    which only has access to its required components.
+    '''
+
+    def __init__(self, ID, components):
+
+        self.ID = ID
+        self._components = components
+        self.active = True
+
+    def getComponent(self, componentType):
+
+        return self._components.get(componentType)
+
+    def hasComponent(self, componentType):
+
+        return componentType in self._components
+
+def _runShard(system, sceneState, componentTypes, storageInfo, chunkSlots, deltaTime):
+
+    '''
+    Runs a system for a chunk of entities in a worker process.
+    :param ecs.System system: The system to run.
+    :param dict sceneState: The public attributes of the scene.
+    :param list(type(ecs.ArrayComponent)) componentTypes: The system's required component types.
+    :param list(tuple) storageInfo: The (storage ID, shared memory info) for each component type's storage.
+    :param list chunkSlots: For each storage, the positions of the entities, or a (start, stop) range.
+    :param float deltaTime: The elapsed time.
+    '''
+
+    scene = types.SimpleNamespace(**sceneState)
+
+    # attach to each storage, with ranges of positions as slices
+    storages = [_AttachedStorage(storageID, info) for storageID, info in storageInfo]
+    chunkSlots = [slice(*slots) if isinstance(slots, tuple) else slots for slots in chunkSlots]
+
+    # array systems process views of the chunk's data in each storage
+    if isinstance(system, ArraySystem):
+        views = {t: ArrayView(storage, slots) for t, storage, slots in zip(componentTypes, storages, chunkSlots)}
+        system.updateBatch(scene, views, deltaTime)
+
+        # copied arrays need to be written back into the shared memory
+        for view in views.values():
+            view.writeBack()
+
+    # other systems are given entities with components that read and write the shared arrays directly
+    else:
+        entityIDs = storages[0].entityIDArray[chunkSlots[0]].tolist()
+        for storage, slots in zip(storages, chunkSlots):
+            positions = range(slots.start, slots.stop) if isinstance(slots, slice) else slots.tolist()
+            storage._sparse = dict(zip(entityIDs, positions))
+        entities = []
+        for entityID in entityIDs:
+            components = {}
+            for componentType, storage in zip(componentTypes, storages):
+                component = componentType.__new__(componentType)
+                component._bind(storage, entityID)
+                components[componentType] = component
+            entities.append(_ShardEntity(entityID, components))
+        _updateShardEntities(system, scene, entities, componentTypes, deltaTime)
+
+def _updateShardEntities(system, scene, entities, componentTypes, deltaTime):
+
+    '''
+    Runs a system's entity-level update methods for entities in a worker process,
+    in the same way as ecs.Scene does in the main process.
+    '''
+
+    systemType = type(system)
+    if system.passComponents is True:
+        batch = [(entity,) + tuple(entity._components[t] for t in componentTypes) for entity in entities]
+
+    # pass all entities at once
+    if systemType.updateEntities is not System.updateEntities:
+        system.updateEntities(scene, batch if system.passComponents is True else entities, deltaTime = deltaTime)
+
+    # or pass each entity in turn
+    elif systemType.updateEntity is not System.updateEntity:
+        for i, entity in enumerate(entities):
+            if system.passComponents is True:
+                system.updateEntity(scene, entity, *batch[i][1:], deltaTime = deltaTime)
+            else:
+                system.updateEntity(scene, entity, deltaTime = deltaTime)
@@ -13,10 +13,55 @@ class System:
         # set the system draw order
         self.drawAfterEntities = True
 
+        # if True, the entity-level update methods are run on worker processes
+        # by the scene's ecs.ShardPool (see ShardPool for requirements)
+        self.runInProcesses = False
+
+        # the minimum elapsed time between updates (0 to update every frame),
+        # e.g. 0.2 updates the system 5 times per second, and each update
+        # is passed all of the time elapsed since the system last updated
+        self.updateInterval = 0
+
+        # an optional time limit (in seconds) for calling updateEntity() each frame,
+        # after which the remaining entities are updated in later frames (round-robin),
+        # each being passed all of the time elapsed since it was last updated
+        # (the elapsed times are kept separately by each scene the system is in)
+        self.updateBudget = None
+
+        # if True, updateEntity() and drawEntity() are passed the entity's
+        # required components (in the order they were added as requirements),
+        # e.g. updateEntity(self, scene, entity, transform, sprite, deltaTime = 1)
+        self.passComponents = False
+
         # initially there are no requirements, which means the
         # system would process all entities in a scene
+        # (the lists are used to get a query for the system from each scene)
         self.requiredComponentTypeList = []
 
+        # entities with any excluded component type are not processed, and if
+        # any-of component types are specified, entities must have at least one
+        self.excludedComponentTypeList = []
+        self.anyComponentTypeList = []
+
+        # entities must also have all required tags, and none of the excluded tags
+        self.requiredTagList = []
+        self.excludedTagList = []
+
+        # if any changed component types are specified, the entity-level update methods
+        # are only passed entities with a component of one of these types that has
+        # changed since the system last updated (updateBudget isn't used, and
+        # systems with runInProcesses = True are still passed all entities)
+        self.changedComponentTypeList = []
+
+        # the component types the system reads and writes, used
+        # by a scene's scheduler to run systems concurrently
+        self.readComponentTypeList = []
+        self.writeComponentTypeList = []
+
+        # the scenes that the system has been added to, which are
+        # notified whenever the system's requirements change
+        self._scenes = []
+
         # run the user-defined init() method
         self.init()
 
@@ -38,6 +83,9 @@ class System:
             if componentType not in self.requiredComponentTypeList:
                 self.requiredComponentTypeList.append(componentType)
 
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
     def removeRequiredComponentType(self, componentType, *otherComponentTypes):
         
         '''
@@ -52,6 +100,234 @@ class System:
             if componentType in self.requiredComponentTypeList:
                 self.requiredComponentTypeList.remove(componentType)
 
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
+    def addExcludedComponentType(self, componentType, *otherComponentTypes):
+
+        '''
+        Add one or more excluded component types to a system.
+        Systems don't run on entities that have any of the excluded components.
+        :param type(ecs.Component) componentType: The component type to exclude.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types to exclude.
+        '''
+
+        # add each component type to the excluded list (if not already added)
+        for componentType in [componentType] + list(otherComponentTypes):
+            if componentType not in self.excludedComponentTypeList:
+                self.excludedComponentTypeList.append(componentType)
+
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
+    def removeExcludedComponentType(self, componentType, *otherComponentTypes):
+
+        '''
+        Removes one or more excluded component types from a system.
+        :param type(ecs.Component) componentType: The component type to no longer exclude.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types to no longer exclude.
+        '''
+
+        # remove each component type from the excluded list (if present)
+        for componentType in [componentType] + list(otherComponentTypes):
+            if componentType in self.excludedComponentTypeList:
+                self.excludedComponentTypeList.remove(componentType)
+
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
+    def addAnyComponentType(self, componentType, *otherComponentTypes):
+
+        '''
+        Add one or more any-of component types to a system.
+        If any-of component types are specified, systems only run on
+        entities that have at least one of them.
+        :param type(ecs.Component) componentType: The component type to add.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types to add.
+        '''
+
+        # add each component type to the any-of list (if not already added)
+        for componentType in [componentType] + list(otherComponentTypes):
+            if componentType not in self.anyComponentTypeList:
+                self.anyComponentTypeList.append(componentType)
+
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
+    def removeAnyComponentType(self, componentType, *otherComponentTypes):
+
+        '''
+        Removes one or more any-of component types from a system.
+        :param type(ecs.Component) componentType: The component type to remove.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types to remove.
+        '''
+
+        # remove each component type from the any-of list (if present)
+        for componentType in [componentType] + list(otherComponentTypes):
+            if componentType in self.anyComponentTypeList:
+                self.anyComponentTypeList.remove(componentType)
+
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
+    def addRequiredTag(self, tag, *moreTags):
+
+        '''
+        Add one or more required tags to a system.
+        Systems only run on the entities that have all of the required tags.
+        :param str tag: The tag to add as a requirement.
+        :param list(str) moreTags: Additional optional tags to add.
+        '''
+
+        # add each tag to the required list (if not already added)
+        for tag in [tag] + list(moreTags):
+            if tag not in self.requiredTagList:
+                self.requiredTagList.append(tag)
+
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
+    def removeRequiredTag(self, tag, *moreTags):
+
+        '''
+        Removes one or more required tags from a system.
+        :param str tag: The tag to remove as a requirement.
+        :param list(str) moreTags: Additional optional tags to remove.
+        '''
+
+        # remove each tag from the required list (if present)
+        for tag in [tag] + list(moreTags):
+            if tag in self.requiredTagList:
+                self.requiredTagList.remove(tag)
+
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
+    def addExcludedTag(self, tag, *moreTags):
+
+        '''
+        Add one or more excluded tags to a system.
+        Systems don't run on entities that have any of the excluded tags.
+        :param str tag: The tag to exclude.
+        :param list(str) moreTags: Additional optional tags to exclude.
+        '''
+
+        # add each tag to the excluded list (if not already added)
+        for tag in [tag] + list(moreTags):
+            if tag not in self.excludedTagList:
+                self.excludedTagList.append(tag)
+
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
+    def removeExcludedTag(self, tag, *moreTags):
+
+        '''
+        Removes one or more excluded tags from a system.
+        :param str tag: The tag to no longer exclude.
+        :param list(str) moreTags: Additional optional tags to no longer exclude.
+        '''
+
+        # remove each tag from the excluded list (if present)
+        for tag in [tag] + list(moreTags):
+            if tag in self.excludedTagList:
+                self.excludedTagList.remove(tag)
+
+        # the entities matched by the system may have changed
+        self._notifyScenes()
+
+    def addChangedComponentType(self, componentType, *otherComponentTypes):
+
+        '''
+        Add one or more changed component types to a system, so that the system's entity-level update methods
+        are only passed entities with a component of one of these types that has changed since the system last updated.
+        Changes to these component types are tracked (see ComponentManager.trackChanges()).
+        :param type(ecs.Component) componentType: The component type to add.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types to add.
+        '''
+
+        # add each component type to the changed list (if not already added)
+        for componentType in [componentType] + list(otherComponentTypes):
+            if componentType not in self.changedComponentTypeList:
+                self.changedComponentTypeList.append(componentType)
+
+        # the entities passed to the system have changed
+        self._notifyScenes()
+
+    def removeChangedComponentType(self, componentType, *otherComponentTypes):
+
+        '''
+        Removes one or more changed component types from a system.
+        :param type(ecs.Component) componentType: The component type to remove.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types to remove.
+        '''
+
+        # remove each component type from the changed list (if present)
+        for componentType in [componentType] + list(otherComponentTypes):
+            if componentType in self.changedComponentTypeList:
+                self.changedComponentTypeList.remove(componentType)
+
+        # the entities passed to the system have changed
+        self._notifyScenes()
+
+    #
+    # declaring component access
+    #
+
+    def addReadComponentType(self, componentType, *otherComponentTypes):
+
+        '''
+        Declares that the system reads (but doesn't change) one or more component types.
+        A scene's scheduler can run systems at the same time if they don't write components the other accesses.
+        :param type(ecs.Component) componentType: The component type the system reads.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types the system reads.
+        '''
+
+        for componentType in [componentType] + list(otherComponentTypes):
+            if componentType not in self.readComponentTypeList:
+                self.readComponentTypeList.append(componentType)
+
+    def addWriteComponentType(self, componentType, *otherComponentTypes):
+
+        '''
+        Declares that the system changes one or more component types.
+        A scene's scheduler can run systems at the same time if they don't write components the other accesses.
+        :param type(ecs.Component) componentType: The component type the system writes.
+        :param list(type(ecs.Component)) otherComponentTypes: Additional optional component types the system writes.
+        '''
+
+        for componentType in [componentType] + list(otherComponentTypes):
+            if componentType not in self.writeComponentTypeList:
+                self.writeComponentTypeList.append(componentType)
+
+    def _declaresAccess(self):
+
+        '''
+        :return bool: Returns True if the system has declared the component types it reads or writes.
+        '''
+
+        return len(self.readComponentTypeList) > 0 or len(self.writeComponentTypeList) > 0
+
+    def __getstate__(self):
+
+        '''
+        Systems are pickled without their scenes (or entities), e.g. when sent to worker processes.
+        '''
+
+        state = self.__dict__.copy()
+        state['_scenes'] = []
+        return state
+
+    def _notifyScenes(self):
+
+        '''
+        Lets each scene containing the system know that the system's
+        requirements have changed, so that it can use a different query.
+        '''
+
+        for scene in self._scenes:
+            scene._onSystemChanged(self)
+
     #
     # system update and draw methods
     #
@@ -92,6 +368,7 @@ class System:
         '''
         This method is called once per frame, for each entity in the scene.
         It is an entity-level method that acts on a specific entity.
+        If passComponents is True, the entity's required components are passed after the entity.
         :param ecs.Scene scene: The scene running the method.
         :param ecs.Entity entity: The entity to process.
         :param float deltaTime: The elapsed game time (default = 1).
@@ -99,15 +376,45 @@ class System:
         
         pass
 
+    def updateEntities(self, scene, entities, deltaTime = 1):
+
+        '''
+        This method is called once per frame, with all of the entities the system processes,
+        and can be overridden instead of updateEntity() to avoid calling a method for each entity.
+        If overridden, updateEntity() is not called.
+        If passComponents is True, entities is a list of (entity, component1, component2, ...) tuples.
+        :param ecs.Scene scene: The scene running the method.
+        :param list(ecs.Entity) entities: The entities to process.
+        :param float deltaTime: The elapsed game time (default = 1).
+        '''
+
+        pass
+
     def drawEntity(self, scene, entity, surface = None):
         
         '''
         This method is called once per frame, for each entity in the scene.
         It is an entity-level method that acts on a specific entity.
+        If passComponents is True, the entity's required components are passed after the entity.
         :param ecs.Scene scene: The scene running the method.
         :param ecs.Entity entity: The entity to process.
         :param any surface: The surface to draw to.
         The type depends on what is being used in the systems (default = None).
         '''
         
-        pass
\ No newline at end of file
+        pass
+
+    def drawEntities(self, scene, entities, surface = None):
+
+        '''
+        This method is called once per frame, with all of the entities the system processes,
+        and can be overridden instead of drawEntity() to avoid calling a method for each entity.
+        If overridden, drawEntity() is not called.
+        If passComponents is True, entities is a list of (entity, component1, component2, ...) tuples.
+        :param ecs.Scene scene: The scene running the method.
+        :param list(ecs.Entity) entities: The entities to process.
+        :param any surface: The surface to draw to.
+        The type depends on what is being used in the systems (default = None).
+        '''
+
+        pass
@@ -0,0 +1,23 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+from .Component import Component
+
+class TrackedComponent(Component):
+
+    '''
+    A component that records a change whenever one of its attributes is set,
+    once it has been added to an entity (see ComponentManager.trackChanges()).
+    Changes made inside an attribute (e.g. component.position[0] = 10) aren't detected,
+    and should be recorded using Entity.markChanged(), or by setting the attribute to a new value.
+    '''
+
+    def __setattr__(self, name, value):
+
+        object.__setattr__(self, name, value)
+
+        # record the change, if the component has been added to an entity
+        trackedBy = self.__dict__.get('_trackedBy')
+        if trackedBy is not None:
+            trackedBy[0].markChanged(trackedBy[1], type(self))
@@ -0,0 +1,105 @@
+# Simple Python ECS
+#  -- By Rik Cross
+#  -- MIT licenced, free to use, modify and distribute
+
+import sys
+
+from .EntityManager import EntityManager
+from .ComponentManager import ComponentManager
+
+class World:
+
+    '''
+    A world owns an entity manager, a component manager and a list of scenes, so that
+    many independent simulations can run in the same process without sharing any state.
+    Entities and scenes are created in the default world, unless another world is specified,
+    e.g. Entity(component, world = world) or Scene(world = world), and entities can only be added
+    to scenes in the same world. A world, along with its entities and scenes, is freed once it is no longer used.
+    Room is made for a number of entity IDs up front, and the space for entity IDs doubles whenever more is needed
+    (each component type's storage grows in the same way as components of the type are added, so that memory
+    scales with the components that exist). Space can be freed after many entities are destroyed by calling compact().
+    :param int capacity: The number of entity IDs to make room for up front (default = 1000).
+    :param int maxEntities: The maximum number of entities that can exist at once (default = None, for no maximum).
+    '''
+
+    def __init__(self, capacity = 1000, maxEntities = None):
+
+        # the world's entity IDs and components
+        self.entityManager = EntityManager(capacity = capacity, maxEntities = maxEntities)
+        self.componentManager = ComponentManager()
+
+        # the scenes in the world
+        self.scenes = []
+
+    @property
+    def capacity(self):
+
+        '''
+        The number of entity IDs there is currently room for, without needing more space.
+        :return int: Returns the capacity.
+        '''
+
+        return self.entityManager.capacity
+
+    def reserve(self, capacity):
+
+        '''
+        Makes room for a number of entity IDs, so that no more space for IDs is needed until they have been used.
+        :param int capacity: The total number of entity IDs to make room for.
+        '''
+
+        self.entityManager.reserve(capacity)
+
+    def compact(self):
+
+        '''
+        Frees unused space (e.g. after many entities have been destroyed), in the
+        entity manager, component storages and scenes. Existing entities are not changed.
+        '''
+
+        self.entityManager.compact()
+        self.componentManager.compact()
+        for scene in self.scenes:
+            scene.compact()
+
+    def getMemoryUsage(self):
+
+        '''
+        Estimates the memory used by the world, to help with sizing hosts.
+        Entities that are not in any scene are not included in 'entityObjects'.
+        :return dict: Returns a dictionary containing:
+         - 'entities': the number of IDs in use
+         - 'capacity': the number of IDs there is room for
+         - 'entityManager': the number of bytes used to manage IDs
+         - 'entityObjects': the number of bytes used by the ecs.Entity objects in the world's scenes
+         - 'components': a dictionary mapping component type names to numbers of bytes
+         - 'scenes': the number of bytes used by the scenes' entities, queries and tag indexes
+         - 'total': the total number of bytes
+        '''
+
+        entityManager = self.entityManager
+        entities = {}
+        for scene in self.scenes:
+            entities.update(scene._entities)
+
+        usage = {
+            'entities': entityManager._nextID - len(entityManager._freeIDs),
+            'capacity': entityManager.capacity,
+            'entityManager': entityManager.getMemoryUsage(),
+            'entityObjects': sum(World._getEntitySize(entity) for entity in entities),
+            'components': self.componentManager.getMemoryUsage(),
+            'scenes': sum(scene.getMemoryUsage() for scene in self.scenes)
+        }
+        usage['total'] = usage['entityManager'] + usage['entityObjects'] + sum(usage['components'].values()) + usage['scenes']
+        return usage
+
+    @staticmethod
+    def _getEntitySize(entity):
+
+        '''
+        Estimates the memory used by an entity object, including its attributes, scenes and tags.
+        :param ecs.Entity entity: The entity.
+        :return int: Returns the estimated number of bytes.
+        '''
+
+        return sys.getsizeof(entity) + sys.getsizeof(entity.__dict__) + sys.getsizeof(entity._scenes) + sys.getsizeof(entity.tags)
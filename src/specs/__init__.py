@@ -8,11 +8,24 @@ __license__ = 'MIT'
 
 from .Entity import Entity
 from .Component import Component
+from .ArrayComponent import ArrayComponent
+from .TrackedComponent import TrackedComponent
 from .System import System
+from .ArraySystem import ArraySystem
 
 from .EntityManager import EntityManager
 from .ComponentManager import ComponentManager
+from .ComponentStorage import ComponentStorage
+from .ArrayStorage import ArrayStorage
+from .ArrayView import ArrayView
 
+from .World import World
 from .Scene import Scene
+from .FixedTimestepLoop import FixedTimestepLoop
+from .Query import Query
+from .CommandBuffer import CommandBuffer
+from .Scheduler import Scheduler
+from .ShardPool import ShardPool
+from .Profiler import Profiler
 
 from .Globals import *